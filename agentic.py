@@ -1,16 +1,113 @@
 # %%
 import os
 import subprocess
-import json
-import re
+import uuid
+import threading
+import contextlib
 from typing import TypedDict, Optional, List, Dict
-from langchain_groq import ChatGroq
 from langgraph.graph import StateGraph, START, END
 from dotenv import load_dotenv
+from llm_pool import invoke_all
+from fs_utils import atomic_write
+from content_store import content_store
+from prompt_batching import batch_budget, batch_max_files, batch_prompt, pack_files, parse_batch_response
+from srs_ingest import chunk_srs, count_tokens, extraction_prompt, merge_specs, parse_json_response, render_spec, token_budget
+from manifest import changed_files, prune_removed, save_manifest, source_for_test, test_path_for
+from executor import run_modules, run_tests
+from artifacts import write_archive
+from model_router import ModelRouter
+from code_patches import PatchError, apply_patch, needs_changes, parse_patch
+from generation_plan import dependency_context, dependency_graph, topological_waves
+from environments import environment_pool, project_requirements, venv_modules
+from static_checks import check_project, format_diagnostics
+from prompts import (GENERATE_TESTS, IMPROVE_PATCH, IMPROVE_REWRITE, REFLECT_ON_ERRORS, REVIEW_CODE, WRITE_CODE,
+                     project_context, prompt_text, record_prompt)
+from scheduler import (FILE_CHANGED, FILE_CLEAN, FILE_FAILING, FILE_STALLED, code_hash, count_statuses, interactive,
+                       route_after_improve, route_after_run)
+from concurrent.futures import ThreadPoolExecutor
+from llm_cache import cache_from_env
+from langchain_core.globals import set_llm_cache
+from langchain_core.callbacks.manager import dispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+from metrics import METRICS, MetricsCallbackHandler, instrument_node, record_cache_lookup
+from checkpoints import checkpointer_from_env, file_checkpoints, thread_config, thread_id_of
  
 # %%
 load_dotenv()
-model = ChatGroq(model=os.getenv("MODEL_NAME"), temperature=0, api_key=os.getenv("GROQ_API_KEY"))
+_model = None
+_router = None
+_router_lock = threading.Lock()
+_chat_factory = None
+_workflow = None
+_llm_cache = None
+_llm_cache_installed = False
+_llm_cache_lock = threading.Lock()
+
+
+def chat_groq(name: str, client=None):
+ 
+    """Builds a ChatGroq client for a model name. langchain_groq is imported
+    here, on the first LLM call, since importing it dominates startup.
+    client swaps the class, e.g. for the replay-only client of the benchmark."""
+ 
+    if client is None:
+        from langchain_groq import ChatGroq as client
+ 
+    return client(model=name, temperature=0, api_key=os.getenv("GROQ_API_KEY"), callbacks=[MetricsCallbackHandler()])
+
+
+def model_for(node: str, escalate: bool = False):
+ 
+    """Returns the chat model a node calls, picked by the model router from
+    the node's tier. escalate moves failing files one tier up. ChatGroq
+    clients are connected on first use rather than at import time."""
+ 
+    global _router
+    get_llm_cache()
+    if _model is not None:
+        return _model
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter.from_env(_chat_factory or chat_groq)
+    return _router.runnable(node, escalate)
+
+
+def use_model(chat_model) -> None:
+ 
+    """Swaps the chat model every node uses, e.g. for the fake model of the
+    offline benchmark."""
+ 
+    global _model
+    _model = chat_model
+
+
+def use_chat_factory(factory) -> None:
+ 
+    """Swaps the factory the model router builds its per-tier clients with;
+    call it before the first LLM call."""
+ 
+    global _chat_factory
+    _chat_factory = factory
+
+
+def get_llm_cache():
+ 
+    """The content-addressed response cache every node shares, so replaying
+    an unchanged SRS at temperature=0 is served without network calls. It is
+    opened and installed process-wide on the first LLM call, not at import
+    time; None when LLM_CACHE is off."""
+ 
+    global _llm_cache, _llm_cache_installed
+    if _llm_cache_installed:
+        return _llm_cache
+    with _llm_cache_lock:
+        if not _llm_cache_installed:
+            _llm_cache = cache_from_env()
+            if _llm_cache:
+                _llm_cache.on_lookup = record_cache_lookup
+                set_llm_cache(_llm_cache)
+            _llm_cache_installed = True
+        return _llm_cache
 
 
 
@@ -20,37 +117,99 @@ from langsmith import traceable
 utils.tracing_is_enabled()
 
 
-import operator
 from typing import Annotated
+
+
+def merge_unique(left: Optional[List[str]], right: Optional[List[str]]) -> List[str]:
+ 
+    """List reducer that appends only entries not seen yet, so a node sending
+    the same file list again does not grow the state."""
+ 
+    merged = list(left or [])
+    seen = set(merged)
+    for item in right or []:
+        if item not in seen:
+            seen.add(item)
+            merged.append(item)
+    return merged
+
+
+def merge_dicts(left: Optional[dict], right: Optional[dict]) -> dict:
+    return {**(left or {}), **(right or {})}
  
 
-class FileStructureState(TypedDict):
+class FileStructureState(TypedDict, total=False):
    
    """A TypedDict representing the state of the file structure generation
-   process with attributes: srs_text (str), file_structure (Optional[List[str]]),
+   process with attributes: srs_ref (str), file_structure (Optional[List[str]]),
    file_descriptions (Optional[Dict[str, str]]), folder_path (str), error_log
-   Optional[str]), retry_count (int), code_feedback (Optional[Dict[str, str]]),
-   improvement_count (int)."""
+   (Optional[Dict[str, str]]), retry_count (int), code_feedback (Optional[Dict[str, str]]),
+   improvement_count (int), changed_files (Optional[List[str]]),
+   execution_results (Optional[Dict[str, dict]]), static_diagnostics
+   (Optional[Dict[str, List[str]]]), review_files (Optional[List[str]]),
+   zip_path (Optional[str]), file_status (Dict[str, str]), file_hashes (Dict[str, str]).
+
+   The SRS text, error output and feedback live in the content store and the
+   state holds their "sha256:" references. Nodes return only the keys they
+   change, so the state stays the same size however many loops run.
+   file_status holds each file's clean/failing/changed/stalled verdict and
+   file_hashes the code hash it had when it last ran; the loop scheduler
+   routes on both."""
    
-   srs_text: Annotated[str,operator.add]
-   file_structure: Annotated[List[str], operator.add]
-   file_descriptions: Annotated[Dict[str, str], lambda a, b: {**a, **b}]
+   srs_ref: str
+   file_structure: Annotated[List[str], merge_unique]
+   file_descriptions: Annotated[Dict[str, str], merge_dicts]
    folder_path: str
-   error_log: Optional[str]
+   error_log: Optional[Dict[str, str]]
    retry_count: int
    code_feedback: Optional[Dict[str, str]]
    improvement_count: int
+   changed_files: Optional[List[str]]
+   execution_results: Annotated[Dict[str, dict], merge_dicts]
+   static_diagnostics: Optional[Dict[str, List[str]]]
+   review_files: Optional[List[str]]
+   zip_path: Optional[str]
+   file_status: Annotated[Dict[str, str], merge_dicts]
+   file_hashes: Annotated[Dict[str, str], merge_dicts]
 
 
 # %%
+def condense_srs(srs_text: str) -> str:
+ 
+    """Map-reduce ingestion for SRS documents over the token budget: the text
+    is split on headings into chunks under SRS_TOKEN_BUDGET, modules,
+    endpoints, entities and requirements are extracted from every chunk in
+    parallel and merged into a compact spec. Small documents pass through,
+    and so does a document none of whose extractions parse."""
+ 
+    budget = token_budget()
+    if count_tokens(srs_text) <= budget:
+        return srs_text
+ 
+    chunks = chunk_srs(srs_text, budget - count_tokens(extraction_prompt("")))
+    print(f"SRS exceeds {budget} tokens, extracting from {len(chunks)} chunks")
+    specs = []
+    for index, response in enumerate(invoke_all(model_for("srs_ingest"), [extraction_prompt(chunk) for chunk in chunks], label="srs_ingest")):
+        try:
+            specs.append(parse_json_response(response))
+        except (ValueError, AttributeError):
+            print(f"Skipping chunk {index}: extraction was not valid JSON")
+    spec = render_spec(merge_specs(specs), budget)
+    if not spec:
+        print("No chunk extraction parsed, passing the full SRS to the architect")
+        return srs_text
+    return spec
+
+
 @traceable
 def srs_to_file_structure(state: FileStructureState) -> FileStructureState:
  
     """Generates a file structure and descriptions from the SRS document."""
    
+    srs_text = condense_srs(content_store().get(state["srs_ref"]))
     prompt = f"""
     You are a software architect. Given the following SRS document:
-    {state["srs_text"]}
+    {srs_text}
     - Generate a structured JSON file tree.
     - Provide a detailed description of each file's purpose and what should be inside it and generate docker file as well and create readme files for every thing and requirements.txt.
     - do not generate tests
@@ -60,29 +219,26 @@ def srs_to_file_structure(state: FileStructureState) -> FileStructureState:
     - Ensure the response is in valid JSON format without any additional text.
     """
    
-    response = model.invoke(prompt)
-    response_str = response.content
- 
-    json_match = re.search(r"```json\s+(.*?)\s+```", response_str, re.DOTALL)
-    if json_match:
-        json_str = json_match.group(1)
-        json_data = json.loads(json_str)
- 
-        file_structure = json_data["files"]
-        file_descriptions = json_data["descriptions"]
- 
-        state["file_structure"] = file_structure
-        state["file_descriptions"] = file_descriptions
-    else:
-        print("JSON data not found")
- 
-    return state
+    response = model_for("srs_to_file_structure").invoke(prompt)
+ 
+    # An empty structure would make create_files_tool prune the whole project,
+    # so an answer without a usable file tree stops the run instead.
+    try:
+        json_data = parse_json_response(response.content)
+        file_structure, file_descriptions = json_data["files"], json_data.get("descriptions") or {}
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"The architect's answer holds no JSON file structure: {e}") from e
+    if not isinstance(file_structure, list) or not file_structure:
+        raise ValueError("The architect's answer lists no files")
+    return {"file_structure": file_structure, "file_descriptions": file_descriptions}
 
 
 @traceable
 def create_files_tool(state: FileStructureState) -> FileStructureState:
  
-    """Creates files and stores descriptions for the next step."""
+    """Creates files and stores descriptions for the next step. In incremental
+    mode only files whose description changed since the last run are reset.
+    Files the new structure no longer lists are deleted with their tests."""
    
     folder_path = state.get("folder_path", os.getenv("FOLDER_PATH"))
     file_structure = state.get("file_structure", [])
@@ -91,95 +247,198 @@ def create_files_tool(state: FileStructureState) -> FileStructureState:
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
  
-    for file_path in file_structure:
+    removed = prune_removed(folder_path, file_structure) if file_structure else []
+    if removed:
+        print(f"Removed {len(removed)} files no longer in the structure: {', '.join(removed)}")
+ 
+    if os.getenv("INCREMENTAL_BUILD", "true").lower() == "true":
+        to_build = changed_files(folder_path, file_structure, file_descriptions)
+        print(f"Incremental build: {len(to_build)} of {len(file_structure)} files changed")
+    else:
+        to_build = list(file_structure)
+ 
+    for file_path in to_build:
         full_path = os.path.join(folder_path, file_path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
  
         with open(full_path, "w") as f:
             f.write(f"# Description: {file_descriptions.get(file_path, 'No description available')}\n\n")
  
-    return state
+    return {"changed_files": to_build}
 
 
 # %%
+def emit_progress(name: str, data: dict) -> None:
+ 
+    """Publishes a custom event to astream_events consumers such as the
+    /runs stream in main.py. Does nothing outside a workflow run."""
+ 
+    try:
+        dispatch_custom_event(name, data)
+    except RuntimeError:
+        pass
+
+
+def invoke_per_file(node: str, config: RunnableConfig, file_paths: List[str], prompts: list,
+                    on_result=None, escalate=()) -> List[str]:
+ 
+    """Runs one prompt per file through the worker pool. Outputs a previous
+    attempt of the same thread already checkpointed for this node are reused
+    instead of calling the model again. Files in escalate go to the next
+    larger model tier. Prompts are rendered templates or plain strings."""
+ 
+    thread_id = thread_id_of(config)
+    checkpoints = file_checkpoints()
+    outputs = [None] * len(prompts)
+    pending = []
+ 
+    for index, (file_path, prompt) in enumerate(zip(file_paths, prompts)):
+        saved = checkpoints.get(thread_id, node, file_path, prompt_text(prompt)) if checkpoints else None
+        if saved is None:
+            pending.append(index)
+            continue
+        outputs[index] = saved
+        if on_result:
+            on_result(index, saved)
+ 
+    if len(pending) < len(prompts):
+        print(f"[{node}] {len(prompts) - len(pending)} files restored from checkpoint")
+ 
+    def record(position, content):
+        index = pending[position]
+        outputs[index] = content
+        if checkpoints:
+            checkpoints.put(thread_id, node, file_paths[index], prompt_text(prompts[index]), content)
+        if on_result:
+            on_result(index, content)
+ 
+    for escalated in (False, True):
+        group = [position for position, index in enumerate(pending) if (file_paths[index] in escalate) == escalated]
+        if not group:
+            continue
+        for position in group:
+            record_prompt(node, prompts[pending[position]])
+        invoke_all(model_for(node, escalated), [prompts[pending[position]] for position in group],
+                   label=f"{node}:escalated" if escalated else node,
+                   on_result=lambda position, content, group=group: record(group[position], content),
+                   keys=[file_paths[pending[position]] for position in group])
+    return outputs
+
+
+def invoke_batched(node: str, config: RunnableConfig, file_paths: List[str], prompts: list,
+                   codes: List[str], instructions: str, on_result=None, context: str = "") -> List[str]:
+
+    """Like invoke_per_file, but packs small files into shared prompts of up
+    to PROMPT_BATCH_BUDGET tokens answered as JSON keyed by file path. Files
+    of a batch whose answer cannot be split back fall back to their own
+    prompt. context is the shared project block of the batched prompts."""
+
+    thread_id = thread_id_of(config)
+    checkpoints = file_checkpoints()
+    outputs = [None] * len(prompts)
+    pending = []
+
+    for index, (file_path, prompt) in enumerate(zip(file_paths, prompts)):
+        saved = checkpoints.get(thread_id, node, file_path, prompt_text(prompt)) if checkpoints else None
+        if saved is None:
+            pending.append(index)
+            continue
+        outputs[index] = saved
+        if on_result:
+            on_result(index, saved)
+
+    batches, singles = pack_files([(file_paths[index], codes[index]) for index in pending], batch_budget(),
+                                  count_tokens(instructions) + count_tokens(context), batch_max_files())
+    batches = [[pending[position] for position in batch] for batch in batches]
+    fallback = [pending[position] for position in singles]
+
+    def record(position, content):
+        batch = batches[position]
+        answers = parse_batch_response(content, [file_paths[index] for index in batch])
+        if answers is None:
+            print(f"[{node}] batched answer for {len(batch)} files could not be parsed, retrying them one by one")
+            fallback.extend(batch)
+            return
+        for index in batch:
+            outputs[index] = answers[file_paths[index]]
+            if checkpoints:
+                checkpoints.put(thread_id, node, file_paths[index], prompt_text(prompts[index]), outputs[index])
+            if on_result:
+                on_result(index, outputs[index])
+
+    if batches:
+        batch_prompts = [batch_prompt(instructions, [(file_paths[index], codes[index]) for index in batch], context)
+                         for batch in batches]
+        for prompt in batch_prompts:
+            record_prompt(node, prompt)
+        invoke_all(model_for(node), batch_prompts,
+                   label=f"{node}:batched", on_result=record,
+                   keys=[",".join(file_paths[index] for index in batch) for batch in batches])
+
+    fallback.sort()
+    results = invoke_per_file(node, config, [file_paths[index] for index in fallback],
+                              [prompts[index] for index in fallback],
+                              on_result=(lambda position, content: on_result(fallback[position], content))
+                              if on_result else None)
+    for index, content in zip(fallback, results):
+        outputs[index] = content
+    return outputs
+
+
 import sys
-def write_code_to_files(state: dict) -> dict:
+def write_code_to_files(state: dict, config: RunnableConfig = None) -> dict:
  
     """Writes code into the generated files based on descriptions and
-    appends requirements to requirements.txt."""
+    writes the third-party requirements they import to requirements.txt. With DEPENDENCY_ORDER, files are
+    generated in waves so every file sees the interfaces of the project files
+    its description refers to."""
  
     folder_path = state.get("folder_path", "generated_project_root")
     file_structure = state.get("file_structure", [])
     file_descriptions = state.get("file_descriptions", {})
  
-    requirements = set()
+    to_generate = state.get("changed_files", file_structure)
  
-    for file_path in file_structure:
-        full_path = os.path.join(folder_path, file_path)
-        description = file_descriptions.get(file_path, "")
-        print(full_path, description)
- 
-        prompt = f"""
-        You are a senior FastAPI developer. Generate a complete Python file based **only** on the following description:  
-        {description}  
- 
-        ### **Constraints:**  
-        - **Only generate code for this specific file:** {file_path}  
-        - **Do not generate code for any other files.**  
-        - **Strictly adhere to the extracted requirements from the description.**  
-        - **Do not assume or add extra functionality beyond what is specified.**  
-        - **Follow FastAPI best practices, keeping the code minimal yet correct.**  
-        - **Use clear and concise variable and function names.**  
-        - **Ensure modularity and error handling but avoid unnecessary abstractions.**  
-        - **Include only relevant docstrings and comments.**  
-        - **Do not generate unit tests unless explicitly requested.**  
-        - **Do Not Give Anything Like pip installs and everything that is present should be python. Do not give notes as well.**
-        """
- 
-        response = model.invoke(prompt)
-        code = response.content.strip()
+    if os.getenv("DEPENDENCY_ORDER", "true").lower() == "true":
+        dependencies_of = dependency_graph(file_structure, file_descriptions)
+        waves = topological_waves(to_generate, dependencies_of)
+        print(f"Generating {len(to_generate)} files in {len(waves)} dependency waves")
+    else:
+        dependencies_of = {}
+        waves = [list(to_generate)]
  
+    def code_prompt(file_path, context, complete):
+        description = file_descriptions.get(file_path, "")
+        print(os.path.join(folder_path, file_path), description)
+        # The shared context already lists every interface unless it was over budget.
+        dependencies = "" if complete else dependency_context(folder_path, dependencies_of.get(file_path, ()))
+        if dependencies:
+            dependencies = f"""
+This file depends on these project modules. Import from them and call them exactly as declared:
+```python
+{dependencies}
+```"""
+        return WRITE_CODE.render(context, file_path=file_path, description=description, dependencies=dependencies)
+ 
+    def write_generated(file_path, code):
         code_lines = code.split('\n')
         filtered_code = "\n".join(line for line in code_lines if "```" not in line)
  
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(filtered_code)
- 
-        for line in code_lines:
-            if "import " in line or "from " in line:
-                parts = line.split()
-                if parts[0] == "import":
-                    requirement = parts[1].split('.')[0]
-                elif parts[0] == "from":
-                    requirement = parts[1].split('.')[0]
-                else:
-                    requirement = None  # Ensure requirement is initialized
-                if requirement and requirement not in file_structure and requirement != "main" and requirement not in file_descriptions:
-                    requirements.add(requirement)
+        atomic_write(os.path.join(folder_path, file_path), filtered_code)
+        emit_progress("file_written", {"file_path": file_path})
  
-    requirements_path = os.path.join(folder_path, "requirements.txt")
-    with open(requirements_path, "w") as req_file:
-        for requirement in sorted(requirements):
-            req_file.write(f"{requirement}\n")
+    # Each wave fans out across a bounded worker pool and every file is
+    # written as soon as its response arrives, ready for the next wave. The
+    # project context is rebuilt per wave, so it covers the earlier waves.
+    for wave in waves:
+        context, complete = project_context(folder_path, file_structure)
+        invoke_per_file("write_code", config, wave, [code_prompt(file_path, context, complete) for file_path in wave],
+                        on_result=lambda index, code, wave=wave: write_generated(wave[index], code))
  
-    if os.path.exists(requirements_path):
-        print("Installing dependencies...")
-        try:
-            result = subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_path], check=True, capture_output=True, text=True)
-            print(result.stdout)
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to install dependencies: {e}")
- 
-    venv_path = os.path.join(folder_path, "venv")
-    if not os.path.exists(venv_path):
-        print("Creating virtual environment...")
-        subprocess.check_call([sys.executable, "-m", "venv", venv_path])
- 
-    if os.name == "nt":
-        activate_script = os.path.join(venv_path, "Scripts", "activate")
-    else:
-        activate_script = os.path.join(venv_path, "bin", "activate")
+    # Requirements are derived from the whole tree, including reused files.
+    requirements = project_requirements(folder_path, file_structure)
+    requirements_path = os.path.join(folder_path, "requirements.txt")
+    atomic_write(requirements_path, "".join(f"{requirement}\n" for requirement in requirements))
  
     env_path = os.path.join(folder_path, ".env")
     if not os.path.exists(env_path):
@@ -192,110 +451,186 @@ def write_code_to_files(state: dict) -> dict:
         load_dotenv(env_path)
  
     print("Environment setup complete.")
-    return state
+    return {}
+
+# %%
+def files_to_check(state: FileStructureState) -> List[str]:
+ 
+    """The changed files on the first review pass; on later passes only the
+    files improve_code actually changed."""
+ 
+    if state.get("improvement_count"):
+        return [file_path for file_path, status in (state.get("file_status") or {}).items() if status == FILE_CHANGED]
+    return state.get("changed_files", state["file_structure"])
+
+
+@traceable
+def static_checks(state: FileStructureState) -> FileStructureState:
+ 
+    """Checks syntax, imports and undefined names of the changed Python files
+    in process, before any LLM review. Third-party imports resolve against
+    the interpreter run_code will use, so the project's venv is built first.
+    Files with findings get them as their review feedback; with
+    STATIC_SKIP_CLEAN, files without findings skip the LLM review altogether."""
+ 
+    file_paths = files_to_check(state)
+    if os.getenv("STATIC_CHECKS", "true").lower() != "true":
+        return {"static_diagnostics": None, "review_files": None,
+                "file_status": {file_path: FILE_CLEAN for file_path in file_paths}}
+ 
+    with project_python(state) as python:
+        third_party = venv_modules(python) if python != sys.executable else set()
+    diagnostics = check_project(state["folder_path"], state["file_structure"], file_paths, third_party=third_party)
+    skip_clean = os.getenv("STATIC_SKIP_CLEAN", "true").lower() == "true"
+    review_files = [
+        file_path for file_path in file_paths
+        if not diagnostics.get(file_path) and not (skip_clean and file_path in diagnostics)
+    ]
+    failing = sum(1 for findings in diagnostics.values() if findings)
+    print(f"Static checks: {failing} of {len(diagnostics)} Python files have findings, "
+          f"{len(review_files)} files left for LLM review")
+    file_status = {file_path: FILE_FAILING if diagnostics.get(file_path) else FILE_CLEAN for file_path in file_paths}
+    return {"static_diagnostics": diagnostics, "review_files": review_files, "file_status": file_status}
 
 # %%
 @traceable
-def reflect_on_code(state: FileStructureState) -> FileStructureState:
+def reflect_on_code(state: FileStructureState, config: RunnableConfig = None) -> FileStructureState:
    
-    """Reads the code and provides feedback for improvements."""
+    """Reads the code and provides feedback for improvements. Files the
+    static checks flagged keep those findings as their feedback."""
  
     print("Reflecting the code")
    
     folder_path = state["folder_path"]
-    code_feedback = {}
- 
-    for file_path in state["file_structure"]:
+    file_paths = state.get("review_files")
+    if file_paths is None:
+        file_paths = files_to_check(state)
+    context, _ = project_context(folder_path, state["file_structure"])
+    prompts = []
+    codes = []
+ 
+    for file_path in file_paths:
         full_path = os.path.join(folder_path, file_path)
  
         with open(full_path, "r") as f:
             code = f.read()
+        codes.append(code)
+        prompts.append(REVIEW_CODE.render(context, file_path=file_path, code=code))
+ 
+    feedback = invoke_batched("reflect_on_code", config, file_paths, prompts, codes, REVIEW_CODE.batch,
+                              context=context)
+    store = content_store()
+    code_feedback = {
+        file_path: store.put(format_diagnostics(findings))
+        for file_path, findings in (state.get("static_diagnostics") or {}).items() if findings
+    }
+    code_feedback.update((file_path, store.put(text)) for file_path, text in zip(file_paths, feedback))
+    return {"code_feedback": code_feedback}
+
+# %%
+def failing_files(state: FileStructureState) -> set:
  
-        prompt = f"""
-        You are a senior software reviewer. Analyze the following code:
-        ```python
-        {code}
-        ```
-        - Identify any missing logic.
-        - Suggest improvements (performance, best practices, security).
-        - List the exact modifications required.
-        """
- 
-        response = model.invoke(prompt)
-        code_feedback[file_path] = response.content.strip()
+    """Files that failed the static checks or the last execution; their
+    improvements go to the larger model tier."""
  
-    state["code_feedback"] = code_feedback
-    return state
+    failing = {file_path for file_path, findings in (state.get("static_diagnostics") or {}).items() if findings}
+    for file_path in state.get("error_log") or {}:
+        failing.add(source_for_test(file_path, state["file_structure"]) if file_path.startswith("tests") else file_path)
+    return failing
+
 
-# %%
 @traceable
-def improve_code(state: FileStructureState) -> FileStructureState:
+def improve_code(state: FileStructureState, config: RunnableConfig = None) -> FileStructureState:
    
-    """Applies improvements based on reflection feedback, with human
-    intervention after 3 iterations."""
+    """Applies improvements based on reflection feedback; in interactive mode
+    a manual review is offered first. In IMPROVE_MODE=patch the model answers
+    with SEARCH/REPLACE blocks that are applied locally; a patch that does not
+    apply or parse falls back to a full rewrite of that file. Files whose
+    contents changed are marked as changed for the scheduler."""
  
     print("Improving The Code")
    
     folder_path = state["folder_path"]
-    code_feedback = state["code_feedback"]
-    state["improvement_count"] = state.get("improvement_count",0) + 1
+    improvement_count = state.get("improvement_count",0) + 1
  
-    if state["improvement_count"] >= 0:
+    if interactive(config):
         user_input = input("\nAre You Ok With The Code Generated (yes/no): ").strip().lower()
         if user_input != "yes":
+            before = {file_path: code_hash(folder_path, [file_path]) for file_path in state["file_structure"]}
             print("\n[Manual Review] Edit the code manually and press Enter to continue...")
             input()
-            return state
+            edited = [file_path for file_path, digest in before.items() if code_hash(folder_path, [file_path]) != digest]
+            return {"improvement_count": improvement_count,
+                    "file_status": {file_path: FILE_CHANGED for file_path in edited}}
    
-    for file_path, feedback in code_feedback.items():
-        full_path = os.path.join(folder_path, file_path)
- 
-        with open(full_path, "r",encoding="utf-8") as f:
-            existing_code = f.read()
- 
-        prompt = f"""
-        You are a senior software engineer. Improve the following Python code:
-        ```python
-        {existing_code}
-        ```
-        Based on the following feedback:
-        ```
-        {feedback}
-        ```
-        ### **Constraints:**  
-        - **Only generate code for this specific file:** {file_path}  
-        - **Do not generate code for any other files.**  
-        - **Strictly adhere to the extracted requirements from the description.**  
-        - **Do not assume or add extra functionality beyond what is specified.**  
-        - **Follow FastAPI best practices, keeping the code minimal yet correct.**  
-        - **Use clear and concise variable and function names.**  
-        - **Ensure modularity and error handling but avoid unnecessary abstractions.**  
-        - **Include only relevant docstrings and comments.**  
-        - **Do not generate unit tests unless explicitly requested.**  
-        - **Do Not Give Anything Like pip installs and everything that is present should be python. Do not give notes as well.**
-        - **Do Not Add Any Thing Likes notes anything extra strict give only the python code**
-        -- *** DO NOT MENTION ANYTHING ELSE OTHER THAN PYTHON IN THE FILE I DONT WANT YOUR ASUPTIONS AND EVERY THING ELSE SHOULD NOT BE PRESENT NO EXTRA TEXT SHOULD BE PRESENT***
-        """
- 
-        response = model.invoke(prompt)
-        improved_code = response.content.strip()
- 
-        code_lines = improved_code.split('\n')
+    store = content_store()
+    received = {file_path: store.get(ref) for file_path, ref in (state.get("code_feedback") or {}).items()}
+    code_feedback = {file_path: feedback for file_path, feedback in received.items() if needs_changes(feedback)}
+    skipped = len(received) - len(code_feedback)
+    if skipped:
+        print(f"[improve_code] {skipped} files need no changes")
+    file_paths = list(code_feedback)
+    sources = {}
+    for file_path in file_paths:
+        with open(os.path.join(folder_path, file_path), "r", encoding="utf-8") as f:
+            sources[file_path] = f.read()
+    before = {file_path: code_hash(folder_path, [file_path]) for file_path in file_paths}
+ 
+    context, _ = project_context(folder_path, state["file_structure"])
+ 
+    def rewrite_prompt(file_path):
+        return IMPROVE_REWRITE.render(context, file_path=file_path, code=sources[file_path],
+                                      feedback=code_feedback[file_path])
+ 
+    def patch_prompt(file_path):
+        return IMPROVE_PATCH.render(context, file_path=file_path, code=sources[file_path],
+                                    feedback=code_feedback[file_path])
+ 
+    def write_rewrite(file_path, improved_code):
+        code_lines = improved_code.strip().split('\n')
         filtered_code = "\n".join(line for line in code_lines if "```" not in line)
+        atomic_write(os.path.join(folder_path, file_path), filtered_code)
  
+    fallback = []
  
-        with open(full_path, "w") as f:
-            f.write(filtered_code)
+    def write_patch(file_path, answer):
+        blocks = parse_patch(answer)
+        if not blocks and not needs_changes(answer):
+            return
+        try:
+            if not blocks:
+                raise PatchError("no SEARCH/REPLACE blocks in the answer")
+            patched = apply_patch(sources[file_path], blocks, python=file_path.endswith(".py"))
+        except PatchError as error:
+            print(f"[improve_code] patch for {file_path} failed ({error}), rewriting the whole file")
+            fallback.append(file_path)
+            return
+        atomic_write(os.path.join(folder_path, file_path), patched)
+ 
+    escalate = failing_files(state)
+    if os.getenv("IMPROVE_MODE", "patch").lower() == "patch":
+        invoke_per_file("improve_code", config, file_paths, [patch_prompt(file_path) for file_path in file_paths],
+                        on_result=lambda index, answer: write_patch(file_paths[index], answer), escalate=escalate)
+    else:
+        fallback = file_paths
+ 
+    fallback = sorted(fallback, key=file_paths.index)
+    invoke_per_file("improve_code", config, fallback, [rewrite_prompt(file_path) for file_path in fallback],
+                    on_result=lambda index, answer: write_rewrite(fallback[index], answer), escalate=escalate)
  
-    return state
+    changed = [file_path for file_path in file_paths if code_hash(folder_path, [file_path]) != before[file_path]]
+    print(f"[improve_code] {len(changed)} of {len(file_paths)} files changed")
+    return {"improvement_count": improvement_count, "file_status": {file_path: FILE_CHANGED for file_path in changed}}
 
 # %%
 @traceable
-def generate_tests(state: FileStructureState) -> FileStructureState:
+def generate_tests(state: FileStructureState, config: RunnableConfig = None) -> FileStructureState:
  
     """
     Reads each Python file in the generated project folder and generates a test case using libraray
-    for it based on its content. Test cases are stored in a "tests" subfolder as separate files.
+    for it based on its content. Test cases are stored in a "tests" subfolder as separate files
+    named after the module's whole path. Changed files and files without a test are covered;
+    small files share one batched prompt.
     """
  
     print("Generating test cases for each Python file...")
@@ -304,107 +639,140 @@ def generate_tests(state: FileStructureState) -> FileStructureState:
     if not os.path.exists(test_folder):
         os.makedirs(test_folder)
  
-    for file_path in state.get("file_structure", []):
-        if not file_path.endswith(".py"):
-            continue
+    changed = set(state.get("changed_files", state.get("file_structure", [])))
+    file_paths = [file_path for file_path in state.get("file_structure", []) if file_path.endswith(".py") and (
+        file_path in changed or not os.path.isfile(os.path.join(folder_path, test_path_for(file_path))))]
+    context, _ = project_context(folder_path, state["file_structure"])
+    prompts = []
+    codes = []
+    for file_path in file_paths:
         full_file_path = os.path.join(folder_path, file_path)
         with open(full_file_path, "r") as f:
             code = f.read()
+        codes.append(code)
         print("Creating Test Case For ", full_file_path)
- 
-        prompt = f"""
-        You are a senior software tester.
-        Analyze the following Python module:
-        ```python
-        {code}
-        ```
-        Based on the module's functionality, generate a complete test case file using a Python testing framework (unittest or pytest).
-        Ensure the tests cover core functionality, error handling, and potential edge cases.
-         **Constraints:**  
-        - **Only generate code for this specific file:**
-        - **Do not generate code for any other files.**  
-        - **Do not assume or add extra functionality beyond what is specified.**  
-        - **Use clear and concise variable and function names.**  
-        - **Ensure modularity and error handling but avoid unnecessary abstractions.**  
-        - **Include only relevant docstrings and comments.**  
-        - **Do Not Give Anything Like pip installs and everything that is present should be python. Do not give notes as well.**
-        - **Do Not Add Any Thing Likes notes anything extra strict give only the python code**
-        -- *** DO NOT MENTION ANYTHING ELSE OTHER THAN PYTHON IN THE FILE I DONT WANT YOUR ASUPTIONS AND EVERY THING ELSE SHOULD NOT BE PRESENT NO EXTRA TEXT SHOULD BE PRESENT***
-        """
-        response = model.invoke(prompt)
-        test_code = response.content.strip()
- 
-        test_code = "\n".join(line for line in test_code.splitlines() if "```" not in line)
- 
-        test_file_name = "test_" + os.path.basename(file_path)
-        test_full_path = os.path.join(test_folder, test_file_name)
-        with open(test_full_path, "w") as test_file:
-            test_file.write(test_code)
-        print(f"Generated test case for {file_path} -> {test_file_name}")
- 
-    return state
+        prompts.append(GENERATE_TESTS.render(context, file_path=file_path, code=code))
+ 
+    def write_test(index, test_code):
+        file_path = file_paths[index]
+        test_code = "\n".join(line for line in test_code.strip().splitlines() if "```" not in line)
+        test_path = test_path_for(file_path)
+        atomic_write(os.path.join(folder_path, test_path), test_code)
+        print(f"Generated test case for {file_path} -> {test_path}")
+ 
+    invoke_batched("generate_tests", config, file_paths, prompts, codes, GENERATE_TESTS.batch, on_result=write_test,
+                   context=context)
+    return {}
 
 # %%
+@contextlib.contextmanager
+def project_python(state: FileStructureState):
+ 
+    """Interpreter the generated code runs under: a pooled venv with the
+    project's current requirements, leased so it is not pruned while the
+    block runs, or this interpreter when INSTALL_DEPENDENCIES is off."""
+ 
+    if os.getenv("INSTALL_DEPENDENCIES", "true").lower() != "true":
+        yield sys.executable
+        return
+    requirements = project_requirements(state["folder_path"], state["file_structure"])
+    with contextlib.ExitStack() as stack:
+        try:
+            python = stack.enter_context(environment_pool().lease(requirements))
+        except (subprocess.CalledProcessError, RuntimeError) as e:
+            print(f"Failed to prepare the environment, running with {sys.executable}: {e}")
+            python = sys.executable
+        yield python
+
+
 @traceable
 def run_code(state: FileStructureState) -> FileStructureState:
    
-    """Runs the generated code, captures errors, and retries if necessary."""
+    """Runs the generated modules and the tests/ suite in sandboxed processes
+    and records a status per file. The first run covers everything; retries
+    only rerun failing and changed files and the tests of changed modules. A
+    file that fails again with unchanged code is marked stalled."""
  
     print("Came Inside Runners")
    
     folder_path = state["folder_path"]
-    error_log = None
- 
-    for file_path in state["file_structure"]:
-        full_path = os.path.join(folder_path, file_path)
-        if not file_path.endswith(".py"):
+    file_structure = state["file_structure"]
+    modules = [file_path for file_path in file_structure if file_path.endswith(".py")]
+    tests = None
+    if state.get("retry_count"):
+        retry = {file_path for file_path, status in (state.get("file_status") or {}).items()
+                 if status in (FILE_FAILING, FILE_CHANGED)}
+        modules = [file_path for file_path in modules if file_path in retry]
+        tests = [file_path for file_path in state.get("execution_results") or {} if file_path.startswith("tests")
+                 and (file_path in retry or source_for_test(file_path, file_structure) in retry)]
+        print(f"Retrying {len(modules)} modules and {len(tests)} test files")
+ 
+    # Modules fan out across a worker pool while the tests run as one pytest session.
+    with project_python(state) as python, ThreadPoolExecutor(max_workers=2) as pool:
+        module_job = pool.submit(run_modules, folder_path, modules, python)
+        test_job = pool.submit(run_tests, folder_path, "tests", python, tests)
+        results = {**module_job.result(), **test_job.result()}
+ 
+    # Output goes to the content store; the state keeps references only.
+    store = content_store()
+    previous_hashes = state.get("file_hashes") or {}
+    error_log = {}
+    execution_results = {}
+    file_status = {}
+    file_hashes = {}
+    for file_path, result in results.items():
+        print(f"{'ok' if result.ok else 'FAILED'} {file_path} ({result.duration:.2f}s, returncode={result.returncode})")
+        execution_results[file_path] = {**result.to_dict(), "stdout": store.put(result.stdout),
+                                        "stderr": store.put(result.stderr)}
+        covered = [file_path]
+        if file_path.startswith("tests"):
+            covered.append(source_for_test(file_path, file_structure))
+        file_hashes[file_path] = code_hash(folder_path, covered)
+        if result.ok:
+            file_status[file_path] = FILE_CLEAN
             continue
- 
-        try:
-            result = subprocess.run(["python", full_path], capture_output=True, text=True)
-            if result.returncode != 0:
-                error_log = result.stderr.strip()
-                print(f"Error in {file_path}:\n{error_log}")
-        except Exception as e:
-            error_log = str(e)
- 
-    state["error_log"] = error_log
-    state["retry_count"] += 1
- 
-    if error_log and state["retry_count"] < os.getenv("MAX_RETRIES"):
-        return state  # Retry fixing the errors
- 
-    return state
+        error_log[file_path] = execution_results[file_path]["stderr"]
+        print(f"Error in {file_path}:\n{result.stderr}")
+        unchanged = previous_hashes.get(file_path) == file_hashes[file_path]
+        file_status[file_path] = FILE_STALLED if unchanged else FILE_FAILING
+ 
+    print(f"Run {state.get('retry_count', 0) + 1}: {count_statuses(file_status)}")
+    return {
+        "execution_results": execution_results,
+        "error_log": error_log or None,
+        "retry_count": state.get("retry_count", 0) + 1,
+        "file_status": file_status,
+        "file_hashes": file_hashes,
+    }
 
 # %%
 @traceable
-def reflect_on_errors(state: FileStructureState) -> FileStructureState:
+def reflect_on_errors(state: FileStructureState, config: RunnableConfig = None) -> FileStructureState:
  
     """Reflects on errors found during code execution,
     provides suggestions for improvements, and updates the state with feedback."""
    
-    if not state["error_log"]:
+    file_status = state.get("file_status") or {}
+    failing = {file_path: error for file_path, error in (state.get("error_log") or {}).items()
+               if file_status.get(file_path) == FILE_FAILING}
+    if not failing:
         print("No errors found, proceeding to final execution.")
-        return state  
+        return {}
  
     print("Reflecting on errors...")
-    error_summary = "\n".join([f"{k}: {v}" for k, v in state["error_log"].items()])
-   
-    prompt = f"""
-    You are an AI software engineer. The following code execution resulted in errors:
- 
-    **Error Summary:**
-    {error_summary}
- 
-    Please provide the best suggestions to improve the code and resolve these errors.
-    """
- 
-    response = model.invoke(prompt)
-    code_feedback[file_path] = response.content.strip()
- 
-    state["code_feedback"] = code_feedback
-   
-    return state
+    store = content_store()
+    errors_by_file = {}
+    for file_path, error in failing.items():
+        source = source_for_test(file_path, state["file_structure"]) if file_path.startswith("tests") else file_path
+        errors_by_file.setdefault(source, []).append(f"{file_path}: {store.get(error)}")
+ 
+    file_paths = list(errors_by_file)
+    prompts = [REFLECT_ON_ERRORS.render(file_path=file_path, error_summary="\n".join(errors_by_file[file_path]))
+               for file_path in file_paths]
+ 
+    # Every file here failed execution, so the call is escalated.
+    suggestions = invoke_per_file("reflect_on_errors", config, file_paths, prompts, escalate=set(file_paths))
+    return {"code_feedback": {file_path: store.put(text) for file_path, text in zip(errors_by_file, suggestions)}}
 
 # %%
 @traceable
@@ -413,93 +781,202 @@ def final_execution(state: FileStructureState) -> FileStructureState:
     """Runs the final version of the error-free code."""
    
     folder_path = state["folder_path"]
+    modules = [file_path for file_path in state["file_structure"] if file_path.endswith(".py")]
  
-    for file_path in state["file_structure"]:
-        full_path = os.path.join(folder_path, file_path)
-        if not file_path.endswith(".py"):
-            continue  # Skip non-Python files
- 
+    with project_python(state) as python:
+        results = run_modules(folder_path, modules, python)
+    for file_path, result in results.items():
         print(f"Running final version: {file_path}")
-        subprocess.run(["python", full_path])
+        print(result.stdout or result.stderr)
  
-    return state
+    unresolved = sorted(file_path for file_path, status in (state.get("file_status") or {}).items()
+                        if status in (FILE_FAILING, FILE_STALLED))
+    if unresolved:
+        print(f"Finished with {len(unresolved)} unresolved files: {', '.join(unresolved)}")
+    return {}
 
 # %%
-import shutil
+@traceable
+def update_manifest(state: FileStructureState) -> FileStructureState:
+ 
+    """Records description and code hashes so the next run only regenerates
+    files whose description changed or whose code was changed on disk."""
+ 
+    save_manifest(state["folder_path"], state["file_structure"], state.get("file_descriptions", {}))
+    return {}
 
+# %%
 @traceable
 def create_zip(state: FileStructureState) -> FileStructureState:
     """
-    Packages the entire generated_project folder into a .zip
-    and records its path in the state.
+    Packages the generated_project folder into a reproducible .zip next to it,
+    without venvs, caches or .env files, and records its path in the state.
     """
     folder = state["folder_path"]
     zip_name = f"{folder}.zip"
-    # create generated_project.zip next to the folder
-    shutil.make_archive(folder, 'zip', folder)
-    state["zip_path"] = zip_name
-    return state
+    write_archive(folder, zip_name)
+    return {"zip_path": zip_name}
 
 # %%
-graph = StateGraph(FileStructureState)
-graph.add_node("reflect_on_code", reflect_on_code)
-graph.add_node("improve_code", improve_code)
-graph.add_node("run_code", run_code)
-graph.add_node("final_execution", final_execution)
-graph.add_node("srs_to_file_structure", srs_to_file_structure)
-graph.add_node("create_files", create_files_tool)
-graph.add_node("write_code", write_code_to_files)
-graph.add_node("reflect_on_errors", reflect_on_errors)
-graph.add_node("generate_tests", generate_tests)
-graph.add_node("create_zip", create_zip)
- 
-graph.add_edge(START, "srs_to_file_structure")
-graph.add_edge("srs_to_file_structure", "create_files")
-graph.add_edge("create_files", "write_code")
-graph.add_edge("write_code", "reflect_on_code")
-graph.add_edge("reflect_on_code", "improve_code")
-graph.add_edge("improve_code", "reflect_on_code")
-graph.add_edge("improve_code", "generate_tests")
-graph.add_edge("generate_tests", "run_code")
-graph.add_edge("run_code", "reflect_on_errors")
-graph.add_edge("reflect_on_errors", "improve_code")
-graph.add_edge("run_code", "final_execution")
-graph.add_edge("final_execution", "create_zip")
-graph.add_edge("create_zip", END)
-
-workflow = graph.compile()
- 
-# %%
-# Mermaid Image Of Png
-from IPython.display import Image, display
+def build_graph() -> StateGraph:
+ 
+    """Builds the uncompiled workflow graph with every node instrumented."""
+ 
+    graph = StateGraph(FileStructureState)
+    graph.add_node("static_checks", instrument_node("static_checks", static_checks))
+    graph.add_node("reflect_on_code", instrument_node("reflect_on_code", reflect_on_code))
+    graph.add_node("improve_code", instrument_node("improve_code", improve_code))
+    graph.add_node("run_code", instrument_node("run_code", run_code))
+    graph.add_node("final_execution", instrument_node("final_execution", final_execution))
+    graph.add_node("srs_to_file_structure", instrument_node("srs_to_file_structure", srs_to_file_structure))
+    graph.add_node("create_files", instrument_node("create_files", create_files_tool))
+    graph.add_node("write_code", instrument_node("write_code", write_code_to_files))
+    graph.add_node("reflect_on_errors", instrument_node("reflect_on_errors", reflect_on_errors))
+    graph.add_node("generate_tests", instrument_node("generate_tests", generate_tests))
+    graph.add_node("update_manifest", instrument_node("update_manifest", update_manifest))
+    graph.add_node("create_zip", instrument_node("create_zip", create_zip))
 
-try:
-    display(Image(workflow.get_graph().draw_mermaid_png()))
-except Exception:
-    raise(Exception)
+    graph.add_edge(START, "srs_to_file_structure")
+    graph.add_edge("srs_to_file_structure", "create_files")
+    graph.add_edge("create_files", "write_code")
+    graph.add_edge("write_code", "static_checks")
+    graph.add_edge("static_checks", "reflect_on_code")
+    graph.add_edge("reflect_on_code", "improve_code")
+    graph.add_conditional_edges("improve_code", route_after_improve,
+                                ["static_checks", "generate_tests", "run_code", "final_execution"])
+    graph.add_edge("generate_tests", "run_code")
+    graph.add_conditional_edges("run_code", route_after_run, ["reflect_on_errors", "final_execution"])
+    graph.add_edge("reflect_on_errors", "improve_code")
+    graph.add_edge("final_execution", "update_manifest")
+    graph.add_edge("update_manifest", "create_zip")
+    graph.add_edge("create_zip", END)
+    return graph
 
 
+def build_workflow(checkpointer=None):
+ 
+    """Compiles the workflow graph, optionally with a checkpointer."""
+ 
+    return build_graph().compile(checkpointer=checkpointer)
+
+
+def get_workflow():
+ 
+    """The shared workflow, compiled on first use. Runs are checkpointed per
+    thread id so a crashed run can be resumed."""
+ 
+    global _workflow
+    if _workflow is None:
+        _workflow = build_workflow(checkpointer_from_env())
+    return _workflow
+ 
 # %%
 # Read the SRS Document
-def read_extracted_text():
-    with open("extracted_text.txt", "r",encoding="utf-8") as f:
+def read_extracted_text(path: str = "extracted_text.txt"):
+    with open(path, "r",encoding="utf-8") as f:
         return f.read()
  
+ 
+def build_initial_state(srs_text: str, folder_path: str = None) -> dict:
+ 
+    """Builds the state a workflow run starts from."""
+ 
+    return {
+        "srs_ref": content_store().put(srs_text),
+        "file_structure": [],
+        "file_descriptions": {},
+        "folder_path": folder_path or os.getenv("FOLDER_PATH"),
+        "error_log": None,
+        "retry_count": 0,
+        "code_feedback": None
+    }
+ 
+def run(initial_state: dict, thread_id: str = None) -> dict:
+ 
+    """Starts a workflow run under a thread id that resume() accepts."""
+ 
+    thread_id = thread_id or uuid.uuid4().hex
+    print(f"Workflow thread id: {thread_id} (resume with: python agentic.py resume {thread_id})")
+    final_state = get_workflow().invoke(initial_state, thread_config(thread_id))
+    print(f"Run report: {METRICS.save_run_report(thread_id, final_state)}")
+    return final_state
+ 
+ 
+def resume(thread_id: str) -> dict:
+ 
+    """Continues a checkpointed run from the last node it completed."""
+ 
+    workflow = get_workflow()
+    if workflow.checkpointer is None:
+        raise RuntimeError("Checkpoints are disabled (CHECKPOINTS=false), there is nothing to resume.")
+    snapshot = workflow.get_state(thread_config(thread_id))
+    if not snapshot.next:
+        print(f"Nothing to resume for thread {thread_id}")
+        return snapshot.values
+    print(f"Resuming thread {thread_id} at {', '.join(snapshot.next)}")
+    final_state = workflow.invoke(None, thread_config(thread_id))
+    print(f"Run report: {METRICS.save_run_report(thread_id, final_state)}")
+    return final_state
+ 
 # %%
-srs_text_doc = read_extracted_text()
+def render_graph(fmt: str = "mermaid") -> str:
+ 
+    """The workflow graph as Mermaid or ASCII text, drawn locally without
+    compiling a checkpointer or calling a rendering service."""
  
+    drawable = build_graph().compile().get_graph()
+    if fmt == "ascii":
+        return drawable.draw_ascii()  # needs grandalf
+    return drawable.draw_mermaid()
 
 
-initial_state = {
-    "srs_text": srs_text_doc,
-    "file_structure": [],
-    "file_descriptions": {},
-    "folder_path": os.getenv("FOLDER_PATH"),
-    "error_log": None,
-    "retry_count": 0,
-    "code_feedback": None
-}
+def main(argv=None) -> int:
+    import argparse
+ 
+    parser = argparse.ArgumentParser(prog="agentic.py", description="Generates a FastAPI project from an SRS document.")
+    commands = parser.add_subparsers(dest="command")
+    run_parser = commands.add_parser("run", help="start a new run (the default)")
+    run_parser.add_argument("--srs", default="extracted_text.txt", help="SRS text file")
+    run_parser.add_argument("--folder", help="output folder, defaults to FOLDER_PATH")
+    run_parser.add_argument("--thread-id", help="checkpoint thread id, generated when omitted")
+    resume_parser = commands.add_parser("resume", help="continue a checkpointed run")
+    resume_parser.add_argument("thread_id")
+    for command_parser in (run_parser, resume_parser):
+        command_parser.add_argument("--non-interactive", action="store_true",
+                                    help="never stop for a manual review (same as INTERACTIVE=false)")
+    graph_parser = commands.add_parser("graph", help="print the workflow graph")
+    graph_parser.add_argument("--format", choices=("mermaid", "ascii"), default="mermaid")
+    graph_parser.add_argument("--output", help="write to this file instead of stdout")
+    args = parser.parse_args(argv)
+ 
+    if args.command == "graph":
+        try:
+            text = render_graph(args.format)
+        except ImportError as e:
+            print(e)
+            return 1
+        if args.output:
+            atomic_write(args.output, text)
+        else:
+            print(text)
+        return 0
+ 
+    if getattr(args, "non_interactive", False):
+        os.environ["INTERACTIVE"] = "false"
+    if args.command == "resume":
+        resume(args.thread_id)
+    else:
+        srs_path = getattr(args, "srs", "extracted_text.txt")
+        initial_state = build_initial_state(read_extracted_text(srs_path), getattr(args, "folder", None))
  
-# %%
-# Workflow Starts Here
-workflow.invoke(initial_state)
\ No newline at end of file
+        # Workflow Starts Here
+        run(initial_state, getattr(args, "thread_id", None))
+ 
+    llm_cache = get_llm_cache()
+    if llm_cache:
+        print(llm_cache.summary())
+    return 0
+ 
+ 
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import os
+import zlib
+import struct
+import fnmatch
+import hashlib
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from fs_utils import UMASK, atomic_write
+
+# Never shipped, whatever ARTIFACT_INCLUDE says.
+DEFAULT_EXCLUDES = (
+    "venv", ".venv", "__pycache__", "*.pyc", ".pytest_cache", ".mypy_cache", ".ruff_cache",
+    ".git", "node_modules", ".env", ".junit.xml", ".agentic_manifest.json", "*.report.json",
+)
+
+# Every entry gets the same timestamp, so identical trees give identical bytes.
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+
+    """(start, end) of a single "bytes=" range, end inclusive, or None for
+    headers that are invalid or not handled, such as multiple ranges, which
+    get the full body. Raises RangeNotSatisfiable when no byte of a valid
+    range lies inside the file."""
+
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if first:
+        if last and int(last) < int(first):
+            return None
+        start, end = int(first), int(last) if last else size - 1
+    else:
+        start, end = size - int(last), size - 1
+    start, end = max(0, start), min(end, size - 1)
+    if start > end:
+        raise RangeNotSatisfiable(header)
+    return start, end
+
+
+def _patterns(name: str, default: str = "") -> List[str]:
+    return [pattern.strip() for pattern in os.getenv(name, default).split(",") if pattern.strip()]
+
+
+def packaging_rules() -> Tuple[List[str], List[str]]:
+
+    """(include, exclude) glob patterns from ARTIFACT_INCLUDE and
+    ARTIFACT_EXCLUDE; the default excludes always apply."""
+
+    return _patterns("ARTIFACT_INCLUDE", "*"), list(DEFAULT_EXCLUDES) + _patterns("ARTIFACT_EXCLUDE")
+
+
+def _excluded(relative_path: str, exclude: List[str]) -> bool:
+    parts = relative_path.split("/")
+    return any(fnmatch.fnmatch(relative_path, pattern) or any(fnmatch.fnmatch(part, pattern) for part in parts)
+               for pattern in exclude)
+
+
+def collect_files(folder_path: str, include: List[str] = None, exclude: List[str] = None) -> List[str]:
+
+    """Relative paths of the files to package, in '/' form and sorted.
+    Excluded directories are not descended into."""
+
+    default_include, default_exclude = packaging_rules()
+    include = include or default_include
+    exclude = default_exclude if exclude is None else exclude
+    files = []
+    for root, dirs, names in os.walk(folder_path):
+        relative_root = os.path.relpath(root, folder_path).replace(os.sep, "/")
+        relative_root = "" if relative_root == "." else f"{relative_root}/"
+        dirs[:] = [name for name in dirs if not _excluded(f"{relative_root}{name}", exclude)]
+        for name in names:
+            relative_path = f"{relative_root}{name}"
+            if _excluded(relative_path, exclude) or os.path.islink(os.path.join(root, name)):
+                continue
+            if any(fnmatch.fnmatch(relative_path, pattern) for pattern in include):
+                files.append(relative_path)
+    return sorted(files)
+
+
+def compression_level() -> int:
+    return int(os.getenv("ARTIFACT_COMPRESSION_LEVEL", "6"))
+
+
+def archive_etag(folder_path: str, files: List[str], level: int) -> str:
+
+    """Strong validator for the archive of files, derived from their paths,
+    sizes and modification times without compressing anything."""
+
+    digest = hashlib.sha256(f"{level}".encode())
+    for relative_path in files:
+        stat = os.stat(os.path.join(folder_path, relative_path))
+        digest.update(f"\0{relative_path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _compress(folder_path: str, relative_path: str, level: int):
+    full_path = os.path.join(folder_path, relative_path)
+    with open(full_path, "rb") as f:
+        data = f.read()
+    crc = zlib.crc32(data)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    method = 8
+    if len(compressed) >= len(data):
+        compressed, method = data, 0
+    executable = os.stat(full_path).st_mode & 0o111
+    return relative_path, method, crc, len(data), compressed, 0o755 if executable else 0o644
+
+
+def iter_zip(folder_path: str, files: List[str], level: int = 6, workers: int = None) -> Iterator[bytes]:
+
+    """Yields a ZIP archive of files chunk by chunk. Files are deflated in a
+    thread pool (zlib releases the GIL) a bounded window ahead of the writer,
+    and every entry gets fixed timestamps and permissions, so the output only
+    depends on the file contents."""
+
+    workers = workers or int(os.getenv("ARTIFACT_WORKERS", str(os.cpu_count() or 4)))
+    date = ((ZIP_EPOCH[0] - 1980) << 9) | (ZIP_EPOCH[1] << 5) | ZIP_EPOCH[2]
+    time = (ZIP_EPOCH[3] << 11) | (ZIP_EPOCH[4] << 5) | (ZIP_EPOCH[5] // 2)
+    central = []
+    offset = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        window = deque()
+        pending = iter(files)
+        for relative_path in pending:
+            window.append(pool.submit(_compress, folder_path, relative_path, level))
+            if len(window) >= workers * 2:
+                break
+        while window:
+            name, method, crc, size, data, mode = window.popleft().result()
+            next_path = next(pending, None)
+            if next_path is not None:
+                window.append(pool.submit(_compress, folder_path, next_path, level))
+
+            encoded = name.encode("utf-8")
+            if offset + len(data) > 0xFFFFFFFF or size > 0xFFFFFFFF:
+                raise ValueError("Archive exceeds 4 GiB, which this writer does not support")
+            header = struct.pack("<IHHHHHIIIHH", 0x04034B50, 20, 0x0800, method, time, date,
+                                 crc, len(data), size, len(encoded), 0)
+            central.append(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | 20, 20, 0x0800, method,
+                                       time, date, crc, len(data), size, len(encoded), 0, 0, 0, 0,
+                                       (0o100000 | mode) << 16, offset) + encoded)
+            yield header + encoded
+            yield data
+            offset += len(header) + len(encoded) + len(data)
+
+    if len(central) > 0xFFFF:
+        raise ValueError("Archive has more than 65535 entries, which this writer does not support")
+    directory = b"".join(central)
+    yield directory
+    yield struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(central), len(central), len(directory), offset, 0)
+
+
+def write_archive(folder_path: str, zip_path: str, files: Optional[List[str]] = None, level: int = None) -> str:
+
+    """Streams the archive of folder_path into zip_path, replacing it
+    atomically, and returns the archive's ETag, which is also kept next to
+    it in <zip_path>.etag."""
+
+    level = compression_level() if level is None else level
+    files = collect_files(folder_path) if files is None else files
+    directory = os.path.dirname(os.path.abspath(zip_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".zip-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter_zip(folder_path, files, level):
+                out.write(chunk)
+        os.chmod(tmp_path, 0o666 & ~UMASK)
+        os.replace(tmp_path, zip_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    etag = archive_etag(folder_path, files, level)
+    atomic_write(f"{zip_path}.etag", etag)
+    return etag
+
+
+def cached_archive(folder_path: str, zip_path: str, files: List[str], level: int) -> str:
+
+    """Makes sure zip_path holds the current archive of files, rebuilding it
+    only when its recorded ETag is stale, and returns that ETag."""
+
+    etag = archive_etag(folder_path, files, level)
+    try:
+        with open(f"{zip_path}.etag", "r", encoding="utf-8") as f:
+            if f.read() == etag and os.path.isfile(zip_path):
+                return etag
+    except FileNotFoundError:
+        pass
+    return write_archive(folder_path, zip_path, files, level)
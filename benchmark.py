@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import contextlib
+import resource
+import tempfile
+import multiprocessing
+
+
+def make_srs(modules: int, paragraphs: int = 3) -> str:
+
+    """Synthetic SRS with one heading per module, so the fake architect plans
+    a project whose size grows with the document."""
+
+    sections = ["# Project Overview", "A service that manages records for several independent modules.", ""]
+    for index in range(modules):
+        name = f"module_{index:03d}"
+        sections.append(f"## Module {name}")
+        for paragraph in range(paragraphs):
+            sections.append(f"The {name} component must store, validate and list its items. "
+                            f"Requirement {paragraph}: every request is authenticated and logged.")
+        sections.append("")
+    return "\n".join(sections)
+
+
+def _first_call_timer():
+
+    """Callback handler that records when the first chat model call starts."""
+
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class FirstCallTimer(BaseCallbackHandler):
+        started_at = None
+
+        def on_chat_model_start(self, serialized, messages, **kwargs):
+            if self.started_at is None:
+                self.started_at = time.perf_counter()
+
+    return FirstCallTimer()
+
+
+def run_case(modules: int, latency: float, output_lines: int, recursion_limit: int, replay: str = None,
+             verbose: bool = False) -> dict:
+
+    """Runs the full StateGraph once in a scratch directory and returns its
+    timings. Meant to run in a fresh process, so imports and peak RSS are
+    measured per case. Cold start runs from before importing agentic to the
+    start of the first LLM call."""
+
+    workdir = tempfile.mkdtemp(prefix="agentic-bench-")
+    os.chdir(workdir)
+    os.environ.update({
+        "LLM_CACHE": "true" if replay else "false",
+        "CHECKPOINTS": "false",
+        "INSTALL_DEPENDENCIES": "false",
+        "INCREMENTAL_BUILD": "false",
+        "INTERACTIVE": "false",
+        "FOLDER_PATH": os.path.join(workdir, "project"),
+    })
+    if replay:
+        os.environ["LLM_CACHE_PATH"] = replay
+
+    process_started = started = time.perf_counter()
+    import agentic
+    from metrics import METRICS, MetricsCallbackHandler
+    from langgraph.errors import GraphRecursionError
+    import_seconds = time.perf_counter() - started
+
+    if not replay:
+        from fake_llm import SyntheticChatModel
+
+        agentic.use_model(SyntheticChatModel(latency=latency, output_lines=output_lines,
+                                             callbacks=[MetricsCallbackHandler()]))
+    # With replay a ChatGroq subclass answers from the recorded cache only; a
+    # miss raises ReplayMiss locally instead of reaching the network.
+    else:
+        import functools
+        from fake_llm import replay_only_client
+
+        os.environ.setdefault("GROQ_API_KEY", "replay-only")
+        agentic.use_chat_factory(functools.partial(agentic.chat_groq, client=replay_only_client()))
+
+    thread_id = uuid.uuid4().hex
+    state = agentic.build_initial_state(make_srs(modules), os.environ["FOLDER_PATH"])
+    timer = _first_call_timer()
+    config = {"recursion_limit": recursion_limit, "configurable": {"thread_id": thread_id}, "callbacks": [timer]}
+    status = "ok"
+    final_state = {}
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    started = time.perf_counter()
+    try:
+        with output:
+            final_state = agentic.build_workflow().invoke(state, config)
+    except GraphRecursionError:
+        status = "recursion_limit"
+    except Exception as error:
+        status = f"error: {type(error).__name__}: {str(error).splitlines()[0]}"
+    total_seconds = time.perf_counter() - started
+
+    report = METRICS.run_report(thread_id)
+    return {
+        "modules": modules,
+        "files": len(final_state.get("file_structure") or []),
+        "status": status,
+        "import_seconds": round(import_seconds, 3),
+        "cold_start_seconds": round(timer.started_at - process_started, 3) if timer.started_at else None,
+        "total_seconds": round(total_seconds, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "llm_calls": int(report["llm_totals"].get("calls", 0)),
+        "prompt_tokens": int(report["llm_totals"].get("prompt_tokens", 0)),
+        "completion_tokens": int(report["llm_totals"].get("completion_tokens", 0)),
+        "nodes": {node: {"runs": int(values.get("runs", 0)), "seconds": round(values.get("seconds", 0), 3)}
+                  for node, values in report["nodes"].items()},
+        "prompts": {node: {name: int(value) for name, value in values.items()}
+                    for node, values in report["prompts"].items()},
+    }
+
+
+def check_cold_start(results: list, target: float) -> list:
+
+    """Returns a message for every case whose cold start exceeded target."""
+
+    return [f"{case['modules']} modules: cold start {case['cold_start_seconds']}s exceeds the {target}s target"
+            for case in results if case["cold_start_seconds"] is not None and case["cold_start_seconds"] > target]
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+
+    """Returns a message for every case that got slower than the baseline by
+    more than tolerance (0.2 = 20%)."""
+
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {case["modules"]: case for case in json.load(f)["cases"]}
+    regressions = []
+    for case in results:
+        previous = baseline.get(case["modules"])
+        if not previous:
+            continue
+        limit = previous["total_seconds"] * (1 + tolerance)
+        if case["total_seconds"] > limit:
+            regressions.append(f"{case['modules']} modules: {case['total_seconds']}s vs baseline "
+                               f"{previous['total_seconds']}s (limit {limit:.3f}s)")
+    return regressions
+
+
+def print_report(results: list) -> None:
+    print(f"{'modules':>8} {'files':>6} {'total s':>9} {'import s':>9} {'cold s':>7} {'llm calls':>10} "
+          f"{'tokens':>9} {'peak MB':>8}  status")
+    for case in results:
+        cold = "-" if case["cold_start_seconds"] is None else f"{case['cold_start_seconds']:.3f}"
+        print(f"{case['modules']:>8} {case['files']:>6} {case['total_seconds']:>9.3f} {case['import_seconds']:>9.3f} "
+              f"{cold:>7} "
+              f"{case['llm_calls']:>10} {case['prompt_tokens'] + case['completion_tokens']:>9} "
+              f"{case['peak_rss_mb']:>8.1f}  {case['status']}")
+    for case in results:
+        print(f"\nPer-node time, {case['modules']} modules:")
+        for node, values in sorted(case["nodes"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"  {node:<24} {values['seconds']:>8.3f}s  {values['runs']} runs")
+        if case["prompts"]:
+            # Without a stable prefix every call pays all its tokens; with it
+            # the shared system prefix is served from the provider's cache.
+            print(f"\nPrompt tokens (local tokenizer), {case['modules']} modules:")
+            print(f"  {'node':<24} {'calls':>6} {'before':>9} {'prefix':>9} {'after':>9}")
+            for node, values in sorted(case["prompts"].items()):
+                before, prefix = values.get("tokens", 0), values.get("prefix_tokens", 0)
+                print(f"  {node:<24} {values.get('calls', 0):>6} {before:>9} {prefix:>9} {before - prefix:>9}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the agentic workflow graph.")
+    parser.add_argument("--sizes", default="1,5,20", help="comma separated SRS sizes, in modules")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake LLM call")
+    parser.add_argument("--output-lines", type=int, default=30, help="lines of code per generated file")
+    parser.add_argument("--recursion-limit", type=int, default=40, help="graph steps before a run is cut off")
+    parser.add_argument("--replay", help="answer from a recorded LLM cache database instead of the fake model")
+    parser.add_argument("--verbose", action="store_true", help="show the workflow's own output")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    parser.add_argument("--cold-start-target", type=float, default=1.5,
+                        help="seconds from import to the first LLM call before the run fails")
+    args = parser.parse_args(argv)
+
+    replay = os.path.abspath(args.replay) if args.replay else None
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for modules in (int(size) for size in args.sizes.split(",")):
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_case, (modules, args.latency, args.output_lines,
+                                                 args.recursion_limit, replay, args.verbose)))
+
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"latency": args.latency, "output_lines": args.output_lines, "cases": results}, f, indent=2)
+
+    regressions = check_cold_start(results, args.cold_start_target)
+    if args.baseline:
+        regressions += compare(results, args.baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
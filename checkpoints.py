@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from manifest import content_hash
+
+
+def checkpoint_path() -> str:
+    return os.getenv("CHECKPOINT_DB", ".checkpoints.sqlite")
+
+
+def checkpoints_enabled() -> bool:
+    return os.getenv("CHECKPOINTS", "true").lower() == "true"
+
+
+def checkpointer_from_env():
+
+    """Builds the durable LangGraph checkpointer for synchronous runs, or None
+    when CHECKPOINTS is switched off."""
+
+    if not checkpoints_enabled():
+        return None
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    return SqliteSaver(sqlite3.connect(checkpoint_path(), check_same_thread=False))
+
+
+def thread_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def thread_id_of(config) -> Optional[str]:
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+class FileCheckpoints:
+
+    """Per-file results of the loops inside a node, keyed by thread id.
+
+    LangGraph only checkpoints between nodes, so a run that dies halfway
+    through write_code or reflect_on_code would redo every file. The loops
+    record each finished file here together with the hash of its prompt, and
+    a resumed run reuses the output while the prompt is unchanged."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_checkpoints ("
+            "thread_id TEXT NOT NULL, node TEXT NOT NULL, file_path TEXT NOT NULL, "
+            "input_hash TEXT NOT NULL, output TEXT NOT NULL, "
+            "PRIMARY KEY (thread_id, node, file_path))"
+        )
+        self._conn.commit()
+
+    def get(self, thread_id: Optional[str], node: str, file_path: str, prompt: str) -> Optional[str]:
+        if thread_id is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT input_hash, output FROM file_checkpoints WHERE thread_id = ? AND node = ? AND file_path = ?",
+                (thread_id, node, file_path),
+            ).fetchone()
+        if row is None or row[0] != content_hash(prompt):
+            return None
+        return row[1]
+
+    def put(self, thread_id: Optional[str], node: str, file_path: str, prompt: str, output: str) -> None:
+        if thread_id is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_checkpoints (thread_id, node, file_path, input_hash, output) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (thread_id, node, file_path, content_hash(prompt), output),
+            )
+            self._conn.commit()
+
+
+_file_checkpoints = None
+_file_checkpoints_lock = threading.Lock()
+
+
+def file_checkpoints() -> Optional[FileCheckpoints]:
+
+    """Shared FileCheckpoints stored next to the graph checkpoints."""
+
+    global _file_checkpoints
+    if not checkpoints_enabled():
+        return None
+    with _file_checkpoints_lock:
+        if _file_checkpoints is None:
+            _file_checkpoints = FileCheckpoints(checkpoint_path())
+    return _file_checkpoints
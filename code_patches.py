@@ -0,0 +1,113 @@
+import re
+import ast
+from typing import List, Optional, Tuple
+
+SEARCH_REPLACE_RE = re.compile(
+    r"^[ \t]*<{5,9} SEARCH[^\n]*\n(.*?)^[ \t]*={5,9}[ \t]*\n(.*?)^[ \t]*>{5,9} REPLACE[^\n]*$", re.DOTALL | re.MULTILINE
+)
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@.*$", re.MULTILINE)
+NO_CHANGES_RE = re.compile(
+    r"^\W*(no (further |additional |other )?(changes|modifications|improvements|issues)"
+    r"( are| is)?( (needed|required|necessary|found))?|looks good( to me)?|NO_CHANGES)[\s.!]*$",
+    re.IGNORECASE,
+)
+
+
+class PatchError(ValueError):
+    pass
+
+
+def needs_changes(feedback: Optional[str]) -> bool:
+
+    """False for empty feedback or an answer that is nothing but a verdict
+    such as "No changes needed." or NO_CHANGES; anything more may list
+    exceptions and always counts."""
+
+    if not feedback or not feedback.strip():
+        return False
+    return not NO_CHANGES_RE.match(feedback.strip())
+
+
+def _hunks_to_blocks(text: str) -> List[Tuple[str, str]]:
+
+    """Turns unified diff hunks into (search, replace) pairs: context and
+    removed lines form the search text, context and added lines the
+    replacement."""
+
+    blocks = []
+    positions = [match.end() for match in HUNK_RE.finditer(text)]
+    for start, end in zip(positions, positions[1:] + [len(text)]):
+        search, replace = [], []
+        for line in text[start:end].split("\n")[1:]:
+            if line.startswith(("---", "+++", "```", "diff ")) or HUNK_RE.match(line):
+                break
+            if line.startswith("-"):
+                search.append(line[1:])
+            elif line.startswith("+"):
+                replace.append(line[1:])
+            elif line.startswith(" ") or line == "":
+                search.append(line[1:])
+                replace.append(line[1:])
+        while search and replace and search[-1] == "" and replace[-1] == "":
+            search.pop()
+            replace.pop()
+        if search:
+            blocks.append(("\n".join(search) + "\n", "\n".join(replace) + "\n" if replace else ""))
+    return blocks
+
+
+def parse_patch(text: str) -> List[Tuple[str, str]]:
+
+    """(search, replace) pairs from SEARCH/REPLACE blocks, or from unified
+    diff hunks when the answer has no blocks."""
+
+    blocks = [(search, replace) for search, replace in SEARCH_REPLACE_RE.findall(text)]
+    return blocks or _hunks_to_blocks(text)
+
+
+def _locate(source: str, search: str) -> Tuple[int, int]:
+
+    """Span of the single place search occurs in source. Falls back to a
+    match that ignores trailing whitespace on each line."""
+
+    count = source.count(search)
+    if count == 1:
+        start = source.index(search)
+        return start, start + len(search)
+    if count > 1:
+        raise PatchError(f"search text occurs {count} times: {search.splitlines()[0]!r}")
+
+    wanted = [line.rstrip() for line in search.rstrip("\n").split("\n")]
+    lines = source.split("\n")
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    matches = [
+        index for index in range(len(lines) - len(wanted) + 1)
+        if [line.rstrip() for line in lines[index:index + len(wanted)]] == wanted
+    ]
+    if len(matches) != 1:
+        first = wanted[0] if wanted else ""
+        raise PatchError(f"search text {'not found' if not matches else 'is ambiguous'}: {first!r}")
+    start = offsets[matches[0]]
+    return start, min(len(source), offsets[matches[0] + len(wanted)])
+
+
+def apply_patch(source: str, blocks: List[Tuple[str, str]], python: bool = True) -> str:
+
+    """Applies the blocks in order. Python sources must still parse after
+    every block; any failure raises PatchError and nothing is written."""
+
+    for number, (search, replace) in enumerate(blocks, start=1):
+        if not search.strip():
+            raise PatchError(f"block {number} has an empty search text")
+        start, end = _locate(source, search)
+        if replace and not replace.endswith("\n") and source[end - 1:end] == "\n":
+            replace += "\n"
+        source = source[:start] + replace + source[end:]
+        if python:
+            try:
+                ast.parse(source)
+            except SyntaxError as error:
+                raise PatchError(f"block {number} leaves a SyntaxError at line {error.lineno}: {error.msg}")
+    return source
@@ -0,0 +1,60 @@
+import os
+import hashlib
+import threading
+from typing import Optional
+
+from fs_utils import atomic_write
+
+
+REF_PREFIX = "sha256:"
+
+
+def is_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX) and len(value) == len(REF_PREFIX) + 64
+
+
+class ContentStore:
+
+    """Content-addressed blobs on disk. Workflow state keeps the short
+    "sha256:<hex>" reference instead of the text, so checkpoints and traces
+    stay small and identical blobs are stored once."""
+
+    def __init__(self, root: str = ".content_store"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def put(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, text)
+        return f"{REF_PREFIX}{digest}"
+
+    def get(self, ref: Optional[str]) -> Optional[str]:
+
+        """Text of a reference; None passes through and plain text (state
+        written before the store existed) is returned unchanged."""
+
+        if not is_ref(ref):
+            return ref
+        with open(self._path(ref[len(REF_PREFIX):]), "r", encoding="utf-8") as f:
+            return f.read()
+
+
+_store: Optional[ContentStore] = None
+_store_lock = threading.Lock()
+
+
+def content_store() -> ContentStore:
+
+    """Shared store under CONTENT_STORE (default .content_store)."""
+
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ContentStore(os.getenv("CONTENT_STORE", ".content_store"))
+        return _store
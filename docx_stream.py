@@ -0,0 +1,137 @@
+import re
+import json
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, Tuple
+
+from fs_utils import atomic_write
+
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+HEADING_NAME_RE = re.compile(r"^heading\s*(\d)$", re.IGNORECASE)
+
+
+def _heading_levels(archive: zipfile.ZipFile) -> Dict[str, int]:
+
+    """Maps paragraph style ids to heading levels using word/styles.xml, so
+    renamed or localised heading styles are still recognised."""
+
+    try:
+        styles = ET.parse(archive.open("word/styles.xml")).getroot()
+    except KeyError:
+        return {}
+    levels = {}
+    for style in styles.iter(f"{W}style"):
+        if style.get(f"{W}type") != "paragraph":
+            continue
+        style_id = style.get(f"{W}styleId")
+        name = style.find(f"{W}name")
+        name = name.get(f"{W}val", "") if name is not None else ""
+        outline = style.find(f"{W}pPr/{W}outlineLvl")
+        match = HEADING_NAME_RE.match(name)
+        if match:
+            levels[style_id] = int(match.group(1))
+        elif name.lower() == "title":
+            levels[style_id] = 1
+        elif outline is not None and outline.get(f"{W}val", "").isdigit() and int(outline.get(f"{W}val")) < 9:
+            levels[style_id] = int(outline.get(f"{W}val")) + 1
+    return levels
+
+
+def _paragraph_text(paragraph) -> str:
+    parts = []
+    for node in paragraph.iter():
+        if node.tag == f"{W}t":
+            parts.append(node.text or "")
+        elif node.tag == f"{W}tab":
+            parts.append("\t")
+        elif node.tag in (f"{W}br", f"{W}cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+
+def iter_blocks(docx_path: str) -> Iterator[Tuple[str, object]]:
+
+    """Walks word/document.xml with iterparse and yields blocks in document
+    order: ("heading", (level, text)), ("paragraph", text), ("row", cells)
+    and ("table_end", None). Finished blocks are dropped from the tree, so
+    memory stays bounded by the largest single block."""
+
+    with zipfile.ZipFile(docx_path) as archive:
+        levels = _heading_levels(archive)
+        with archive.open("word/document.xml") as xml:
+            body = None
+            table_depth = 0
+            for event, element in ET.iterparse(xml, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    if tag == f"{W}body":
+                        body = element
+                    elif tag == f"{W}tbl":
+                        table_depth += 1
+                    continue
+
+                if tag == f"{W}p" and table_depth == 0:
+                    text = _paragraph_text(element)
+                    style = element.find(f"{W}pPr/{W}pStyle")
+                    level = levels.get(style.get(f"{W}val")) if style is not None else None
+                    if level and text.strip():
+                        yield "heading", (level, text.strip())
+                    else:
+                        yield "paragraph", text
+                elif tag == f"{W}tr" and table_depth == 1:
+                    cells = [
+                        " ".join(_paragraph_text(p).strip() for p in cell.iter(f"{W}p")).strip()
+                        for cell in element.findall(f"{W}tc")
+                    ]
+                    yield "row", cells
+                    element.clear()
+                elif tag == f"{W}tbl":
+                    table_depth -= 1
+                    if table_depth == 0:
+                        yield "table_end", None
+
+                # Release every top-level block as soon as it has been handled.
+                if body is not None and table_depth == 0 and tag in (f"{W}p", f"{W}tbl", f"{W}sectPr"):
+                    body.clear()
+
+
+def extract_docx(docx_path: str, text_path: str, outline_path: str) -> dict:
+
+    """Streams the document into text_path (headings as markdown '#' lines,
+    tables as '|' rows) and writes the section outline to outline_path.
+
+    Returns the outline together with the number of characters written."""
+
+    outline = []
+    characters = 0
+    line_number = 0
+    in_table = False
+    with open(text_path, "w", encoding="utf-8") as out:
+
+        def write(line: str) -> None:
+            nonlocal characters, line_number
+            out.write(line + "\n")
+            characters += len(line) + 1
+            line_number += line.count("\n") + 1
+
+        for kind, value in iter_blocks(docx_path):
+            if kind == "row":
+                if not in_table:
+                    write("")
+                    in_table = True
+                write("| " + " | ".join(cell.replace("|", "\\|").replace("\n", " ") for cell in value) + " |")
+                continue
+            if kind == "table_end":
+                write("")
+                in_table = False
+                continue
+            if kind == "heading":
+                level, title = value
+                outline.append({"level": level, "title": title, "line": line_number + 1})
+                write("#" * min(level, 6) + " " + title)
+            else:
+                write(value)
+
+    atomic_write(outline_path, json.dumps(outline, indent=2))
+    return {"characters": characters, "outline": outline}
@@ -0,0 +1,299 @@
+import os
+import re
+import ast
+import sys
+import json
+import time
+import shutil
+import hashlib
+import functools
+import contextlib
+import threading
+import subprocess
+from importlib.metadata import packages_distributions
+from typing import Iterable, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are only serialised within the process
+    fcntl = None
+
+
+# Import names whose distribution on PyPI is called something else.
+IMPORT_TO_DISTRIBUTION = {
+    "attr": "attrs",
+    "bs4": "beautifulsoup4",
+    "Crypto": "pycryptodome",
+    "cv2": "opencv-python",
+    "dateutil": "python-dateutil",
+    "docx": "python-docx",
+    "dotenv": "python-dotenv",
+    "email_validator": "email-validator",
+    "jose": "python-jose",
+    "jwt": "PyJWT",
+    "magic": "python-magic",
+    "multipart": "python-multipart",
+    "MySQLdb": "mysqlclient",
+    "PIL": "Pillow",
+    "psycopg2": "psycopg2-binary",
+    "pydantic_settings": "pydantic-settings",
+    "slugify": "python-slugify",
+    "sklearn": "scikit-learn",
+    "socketio": "python-socketio",
+    "yaml": "PyYAML",
+}
+
+# The generated tests always run under pytest inside the environment.
+BASE_REQUIREMENTS = ("pytest",)
+
+_installed_distributions = functools.lru_cache(maxsize=1)(packages_distributions)
+
+IMPORT_LINE_RE = re.compile(r"^\s*(?:from\s+([A-Za-z_][\w.]*)\s+import|import\s+([A-Za-z_][\w.]*))", re.MULTILINE)
+
+
+def _imports_of(source: str) -> Set[str]:
+
+    """Top-level names of the absolute imports of a module. Sources that do
+    not parse are scanned line by line instead."""
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {(match.group(1) or match.group(2)).split(".")[0] for match in IMPORT_LINE_RE.finditer(source)}
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def distribution_for(module: str) -> str:
+
+    """PyPI distribution that provides an import name, using the known
+    aliases, then the host's installed packages, then the name itself."""
+
+    if module in IMPORT_TO_DISTRIBUTION:
+        return IMPORT_TO_DISTRIBUTION[module]
+    installed = _installed_distributions().get(module)
+    if installed:
+        return installed[0]
+    return module.replace("_", "-")
+
+
+def project_requirements(folder_path: str, file_structure: List[str]) -> List[str]:
+
+    """Distributions the generated project imports, without standard library
+    modules and without the project's own packages and modules."""
+
+    local = set()
+    for file_path in file_structure:
+        for part in file_path.replace("\\", "/").split("/"):
+            local.add(part[:-3] if part.endswith(".py") else part)
+
+    imports = set()
+    for file_path in file_structure:
+        full_path = os.path.join(folder_path, file_path)
+        if file_path.endswith(".py") and os.path.isfile(full_path):
+            with open(full_path, "r", encoding="utf-8", errors="replace") as f:
+                imports |= _imports_of(f.read())
+
+    return sorted(
+        {distribution_for(name) for name in imports if name not in sys.stdlib_module_names and name not in local},
+        key=str.lower,
+    )
+
+
+def requirements_key(requirements: Iterable[str]) -> str:
+
+    """Pool key of a requirement set on the running Python version."""
+
+    lines = sorted({line.strip().lower() for line in requirements if line.strip()})
+    payload = json.dumps({"python": list(sys.version_info[:2]), "requirements": lines})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _normalise(requirements: Iterable[str]) -> List[str]:
+    return sorted(set(BASE_REQUIREMENTS) | {line.strip() for line in requirements if line.strip()})
+
+
+def _venv_python(path: str) -> str:
+    if os.name == "nt":
+        return os.path.join(path, "Scripts", "python.exe")
+    return os.path.join(path, "bin", "python")
+
+
+def _site_packages(path: str) -> List[str]:
+    if os.name == "nt":
+        candidates = [os.path.join(path, "Lib", "site-packages")]
+    else:
+        lib = os.path.join(path, "lib")
+        candidates = [os.path.join(lib, name, "site-packages") for name in os.listdir(lib)] if os.path.isdir(lib) else []
+    return [candidate for candidate in candidates if os.path.isdir(candidate)]
+
+
+def venv_modules(python: str) -> Set[str]:
+
+    """Top-level import names installed in the venv of a pooled interpreter,
+    read from its site-packages without starting it."""
+
+    modules = set()
+    for site_packages in _site_packages(os.path.dirname(os.path.dirname(python))):
+        for entry in os.listdir(site_packages):
+            if entry.endswith((".dist-info", ".egg-info", ".pth")) or entry.startswith(("_", ".")):
+                continue
+            if os.path.isdir(os.path.join(site_packages, entry)) or entry.endswith((".py", ".so", ".pyd")):
+                modules.add(entry.split(".")[0])
+    return modules
+
+
+class EnvironmentPool:
+
+    """Prebuilt virtualenvs keyed by the hash of their requirement set.
+
+    Projects with the same requirements share one venv, which is built once
+    and reused across runs. Packages are installed from a local wheel cache
+    with --no-index; wheels missing from the cache are downloaded into it
+    first unless offline is set. At most size venvs are kept, least recently
+    used ones are removed unless a lease() holds them.
+
+    Builds are serialised per requirement set only, by an in-process lock and
+    a flock on <key>.lock; runners hold a shared flock on <key>.use, which
+    pruning needs exclusively."""
+
+    def __init__(self, root: str = ".venvs", wheel_dir: str = ".wheels", size: int = 8, offline: bool = False):
+        self.root = os.path.abspath(root)
+        self.wheel_dir = os.path.abspath(wheel_dir)
+        self.size = size
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._users = {}
+        os.makedirs(self.root, exist_ok=True)
+        os.makedirs(self.wheel_dir, exist_ok=True)
+
+    def python_for(self, requirements: Iterable[str]) -> str:
+
+        """Interpreter of a venv that has requirements installed, building it
+        on first use. Use lease() to keep the venv while running in it."""
+
+        requirements = _normalise(requirements)
+        return self._ensure(requirements_key(requirements), requirements)
+
+    @contextlib.contextmanager
+    def lease(self, requirements: Iterable[str]) -> Iterator[str]:
+
+        """Like python_for, but the venv is not pruned before the block exits."""
+
+        requirements = _normalise(requirements)
+        key = requirements_key(requirements)
+        with self._lock:
+            self._users[key] = self._users.get(key, 0) + 1
+        try:
+            with open(os.path.join(self.root, f"{key}.use"), "a") as use:
+                if fcntl:
+                    fcntl.flock(use, fcntl.LOCK_SH)
+                yield self._ensure(key, requirements)
+        finally:
+            with self._lock:
+                self._users[key] -= 1
+                if not self._users[key]:
+                    del self._users[key]
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _ensure(self, key: str, requirements: List[str]) -> str:
+        path = os.path.join(self.root, key)
+        marker = os.path.join(path, ".ready")
+
+        with self._key_lock(key), open(os.path.join(self.root, f"{key}.lock"), "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.exists(marker):
+                os.utime(marker)
+                print(f"Reusing environment {key} ({len(requirements)} requirements)")
+                return _venv_python(path)
+
+            started = time.perf_counter()
+            shutil.rmtree(path, ignore_errors=True)
+            subprocess.run([sys.executable, "-m", "venv", path], check=True, capture_output=True)
+            self._install(_venv_python(path), requirements)
+            with open(marker, "w", encoding="utf-8") as f:
+                f.write("\n".join(requirements) + "\n")
+            print(f"Built environment {key} in {time.perf_counter() - started:.1f}s")
+
+        self._prune(keep=key)
+        return _venv_python(path)
+
+    def installed_modules(self) -> Set[str]:
+
+        """Top-level import names installed in the ready venvs of the pool."""
+
+        modules = set()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.exists(os.path.join(path, ".ready")):
+                modules |= venv_modules(_venv_python(path))
+        return modules
+
+    def _install(self, python: str, requirements: List[str]) -> None:
+        requirements_file = os.path.join(os.path.dirname(os.path.dirname(python)), "requirements.txt")
+        with open(requirements_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(requirements) + "\n")
+        install = [python, "-m", "pip", "install", "--disable-pip-version-check", "--no-index",
+                   "--find-links", self.wheel_dir, "-r", requirements_file]
+
+        if subprocess.run(install, capture_output=True, text=True).returncode == 0:
+            return
+        if self.offline:
+            raise RuntimeError(f"Requirements are missing from the wheel cache {self.wheel_dir}: {requirements}")
+        print(f"Filling the wheel cache {self.wheel_dir}")
+        subprocess.run([python, "-m", "pip", "download", "--disable-pip-version-check", "-d", self.wheel_dir,
+                        "-r", requirements_file], check=True, capture_output=True, text=True)
+        subprocess.run(install, check=True, capture_output=True, text=True)
+
+    def _prune(self, keep: str) -> None:
+        ready = []
+        for name in os.listdir(self.root):
+            marker = os.path.join(self.root, name, ".ready")
+            if name != keep and os.path.exists(marker):
+                ready.append((os.path.getmtime(marker), name))
+        excess = len(ready) + 1 - self.size
+        for _, name in sorted(ready):
+            if excess <= 0:
+                break
+            with open(os.path.join(self.root, f"{name}.use"), "a") as use:
+                if fcntl:
+                    try:
+                        fcntl.flock(use, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue
+                with self._lock:
+                    if name in self._users:
+                        continue
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                excess -= 1
+
+
+_pool: Optional[EnvironmentPool] = None
+_pool_lock = threading.Lock()
+
+
+def environment_pool() -> EnvironmentPool:
+
+    """Shared pool configured from VENV_POOL_DIR, VENV_POOL_SIZE,
+    WHEEL_CACHE_DIR and OFFLINE_INSTALL."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = EnvironmentPool(
+                root=os.getenv("VENV_POOL_DIR", ".venvs"),
+                wheel_dir=os.getenv("WHEEL_CACHE_DIR", ".wheels"),
+                size=int(os.getenv("VENV_POOL_SIZE", "8")),
+                offline=os.getenv("OFFLINE_INSTALL", "false").lower() == "true",
+            )
+        return _pool
@@ -0,0 +1,233 @@
+import os
+import sys
+import time
+import uuid
+import signal
+import tempfile
+import subprocess
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, asdict, replace
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+# Runs `python <script>` or `python -m <module>` after applying the rlimits in
+# the child itself: preexec_fn is not safe in a process that has threads.
+# A listen() call touches the marker file, which tells servers apart from
+# modules that merely hang.
+SANDBOX_BOOTSTRAP = """
+import os, sys, runpy, socket
+memory_mb, cpu_seconds, marker = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+try:
+    import resource
+except ImportError:
+    resource = None
+if resource is not None and memory_mb:
+    resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, memory_mb * 1024 * 1024))
+if resource is not None and cpu_seconds:
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+_listen = socket.socket.listen
+def listen(self, *args):
+    open(marker, "a").close()
+    return _listen(self, *args)
+socket.socket.listen = listen
+del listen
+args = sys.argv[4:]
+if args[0] == "-m":
+    sys.argv = args[1:]
+    runpy.run_module(args[1], run_name="__main__", alter_sys=True)
+else:
+    sys.argv = args
+    sys.path[0] = os.path.dirname(os.path.abspath(args[0]))
+    runpy.run_path(args[0], run_name="__main__")
+"""
+
+
+@dataclass
+class ExecutionResult:
+
+    """Outcome of one sandboxed job."""
+
+    file_path: str
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool = False
+    serving: bool = False
+
+    @property
+    def ok(self) -> bool:
+        # A server hits the wall-clock limit without crashing; any other
+        # module that times out, e.g. in an endless loop, fails.
+        if self.timed_out:
+            return self.serving and "Traceback" not in self.stderr
+        return self.returncode == 0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "ok": self.ok}
+
+
+# Host variables a sandboxed child may see; everything else, API keys
+# included, stays in the parent. EXEC_ENV_PASSTHROUGH adds more names.
+ENV_PASSTHROUGH = ("PATH", "HOME", "USERPROFILE", "LANG", "LANGUAGE", "TZ", "TMPDIR", "TEMP", "TMP",
+                   "SYSTEMROOT", "COMSPEC", "PATHEXT")
+
+
+def _project_env(folder_path: str) -> Dict[str, str]:
+
+    """KEY=VALUE pairs of the project's own .env file, if it has one."""
+
+    values = {}
+    path = os.path.join(folder_path, ".env")
+    if not os.path.isfile(path):
+        return values
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("export "):
+                line = line[len("export "):].lstrip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = (part.strip() for part in line.split("=", 1))
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            values[key] = value
+    return values
+
+
+def sandbox_env(cwd: str) -> Dict[str, str]:
+
+    """Minimal environment of a sandboxed child: the passthrough variables and
+    locale settings of the host, the project's .env and the Python settings."""
+
+    names = set(ENV_PASSTHROUGH) | {name.strip() for name in os.getenv("EXEC_ENV_PASSTHROUGH", "").split(",")}
+    env = {name: value for name, value in os.environ.items() if name in names or name.startswith("LC_")}
+    env.update(_project_env(cwd))
+    env.update({"PYTHONPATH": os.path.abspath(cwd), "PYTHONDONTWRITEBYTECODE": "1"})
+    return env
+
+
+def run_job(command: List[str], cwd: str, label: str, timeout: float = None,
+            memory_mb: int = None) -> ExecutionResult:
+
+    """Runs a Python command ([python, script, ...] or [python, "-m", module,
+    ...]) in its own session with wall-clock, CPU and memory limits and kills
+    the whole process group when it overruns. The limits are applied by
+    SANDBOX_BOOTSTRAP inside the child, so this is safe to call from threads.
+    The child only gets sandbox_env(cwd), never the parent's secrets."""
+
+    timeout = timeout if timeout is not None else float(os.getenv("EXEC_TIMEOUT", "30"))
+    memory_mb = memory_mb if memory_mb is not None else int(os.getenv("EXEC_MEMORY_MB", "1024"))
+    env = sandbox_env(cwd)
+    marker = os.path.join(tempfile.gettempdir(), f"agentic-serving-{uuid.uuid4().hex}")
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [command[0], "-c", SANDBOX_BOOTSTRAP, str(memory_mb), str(int(timeout) + 1), marker, *command[1:]],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=os.name != "nt",
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+        timed_out = False
+    except subprocess.TimeoutExpired:
+        if os.name != "nt":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+        stdout, stderr = process.communicate()
+        stderr = f"{stderr}\nTimed out after {timeout:.0f}s".strip()
+        timed_out = True
+    serving = os.path.exists(marker)
+    if serving:
+        os.remove(marker)
+
+    return ExecutionResult(
+        file_path=label,
+        returncode=None if timed_out else process.returncode,
+        stdout=stdout,
+        stderr=stderr.strip(),
+        duration=time.perf_counter() - started,
+        timed_out=timed_out,
+        serving=serving,
+    )
+
+
+def run_modules(folder_path: str, file_paths: List[str], python: str = sys.executable,
+                max_workers: int = None) -> Dict[str, ExecutionResult]:
+
+    """Runs every module as its own sandboxed process, several at a time.
+    Results are keyed by file path in the order given."""
+
+    max_workers = max_workers or int(os.getenv("EXEC_WORKERS", str(os.cpu_count() or 4)))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = pool.map(lambda file_path: run_job([python, file_path], folder_path, file_path), file_paths)
+        return dict(zip(file_paths, results))
+
+
+def run_tests(folder_path: str, test_dir: str = "tests", python: str = sys.executable,
+              only: Optional[List[str]] = None) -> Dict[str, ExecutionResult]:
+
+    """Runs the whole generated test suite in a single pytest session and splits
+    the JUnit report back into one result per test file. only restricts the
+    session to those test files, e.g. to retry just the failing ones."""
+
+    test_root = os.path.join(folder_path, test_dir)
+    if not os.path.isdir(test_root):
+        return {}
+    test_files = sorted(
+        os.path.join(test_dir, name) for name in os.listdir(test_root)
+        if name.startswith("test_") and name.endswith(".py")
+    )
+    if only is not None:
+        test_files = [path for path in test_files if path in set(only)]
+    if not test_files:
+        return {}
+
+    report = os.path.join(test_root, ".junit.xml")
+    session = run_job(
+        [python, "-m", "pytest", *([test_dir] if only is None else test_files), "-q", "-p", "no:cacheprovider",
+         "--continue-on-collection-errors", f"--junitxml={os.path.abspath(report)}"],
+        folder_path,
+        test_dir,
+        timeout=float(os.getenv("EXEC_TEST_TIMEOUT", "300")),
+    )
+
+    durations = {path: 0.0 for path in test_files}
+    failures = {path: [] for path in test_files}
+    if os.path.isfile(report):
+        modules = {path[:-3].replace(os.sep, "."): path for path in test_files}
+        for case in ET.parse(report).getroot().iter("testcase"):
+            # Collection errors carry the module path in name and no classname.
+            classname = case.get("classname") or case.get("name", "")
+            path = next((p for m, p in modules.items() if classname == m or classname.startswith(m + ".")), None)
+            if path is None:
+                continue
+            durations[path] += float(case.get("time", 0) or 0)
+            for problem in list(case.findall("failure")) + list(case.findall("error")):
+                failures[path].append(f"{case.get('name')}: {problem.get('message', '')}\n{problem.text or ''}".strip())
+        os.remove(report)
+    elif session.returncode or session.timed_out:
+        # pytest never got as far as writing a report (crash or timeout), so
+        # every test file is reported as failing with the session output.
+        return {
+            path: replace(session, file_path=path, returncode=session.returncode or 1, timed_out=False)
+            for path in test_files
+        }
+
+    results = {}
+    for path in test_files:
+        failed = bool(failures[path])
+        results[path] = ExecutionResult(
+            file_path=path,
+            returncode=1 if failed else 0,
+            stdout="",
+            stderr="\n\n".join(failures[path]),
+            duration=durations[path],
+        )
+    return results
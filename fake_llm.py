@@ -0,0 +1,119 @@
+import re
+import json
+import time
+import hashlib
+import functools
+from typing import Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+MODULE_RE = re.compile(r"\bmodule_\d+\b")
+BATCH_FILE_RE = re.compile(r"^\s*### FILE: (.+)$", re.MULTILINE)
+
+
+class SyntheticChatModel(BaseChatModel):
+
+    """Deterministic offline stand-in for ChatGroq.
+
+    Recognises which workflow prompt it received and answers in the shape the
+    node expects (file tree JSON, extraction JSON, Python code, tests, review
+    text, SEARCH/REPLACE patches, or JSON keyed by file path for batched
+    prompts), after sleeping latency seconds. Modules are discovered from
+    'module_<n>' names in the prompt, so larger SRS fixtures yield larger
+    projects."""
+
+    latency: float = 0.0
+    output_lines: int = 20
+    files_per_module: int = 2
+
+    @property
+    def _llm_type(self) -> str:
+        return "synthetic"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"latency": self.latency, "output_lines": self.output_lines, "files_per_module": self.files_per_module}
+
+    def _respond(self, prompt: str) -> str:
+        modules = sorted(set(MODULE_RE.findall(prompt)))
+        if "Return a JSON object keyed by file path" in prompt:
+            instructions = prompt.split("### FILE: ", 1)[0]
+            return json.dumps({path: self._respond(f"{instructions}\n{path}") for path in BATCH_FILE_RE.findall(prompt)})
+        if "<<<<<<< SEARCH" in prompt:
+            match = re.search(r"^def \w+\(.*\).*:$", prompt, re.MULTILINE)
+            if not match:
+                return "NO_CHANGES"
+            return f"<<<<<<< SEARCH\n{match.group(0)}\n=======\n{match.group(0)}\n>>>>>>> REPLACE"
+        if "You are a software architect. Given" in prompt:
+            files = ["app/__init__.py", "app/main.py"]
+            for module in modules:
+                files.extend(f"app/{layer}/{module}.py" for layer in ("models", "routes", "services")[:self.files_per_module])
+            descriptions = {path: f"Implements {path} with typed functions and error handling." for path in files}
+            return "```json\n" + json.dumps({"files": files, "descriptions": descriptions}, indent=2) + "\n```"
+        if "reading one part of a larger SRS" in prompt:
+            return json.dumps({
+                "modules": [{"name": module, "description": f"Handles {module}."} for module in modules],
+                "endpoints": [{"name": f"GET /{module}", "description": f"Lists {module} items."} for module in modules],
+                "entities": [],
+                "requirements": [],
+            })
+        if "senior software tester" in prompt:
+            return "\n".join(["import pytest", "", ""] + [
+                f"def test_case_{index}():\n    assert {index} == {index}\n" for index in range(max(1, self.output_lines // 4))
+            ])
+        if "senior software reviewer" in prompt or "AI software engineer" in prompt:
+            return "\n".join(f"- Consider improvement {index} for readability." for index in range(max(1, self.output_lines // 4)))
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:6], 16)
+        lines = ['"""Synthetic module."""', ""]
+        for index in range(max(1, self.output_lines // 3)):
+            lines.extend([f"def function_{index}(value: int) -> int:", f"    return value + {(seed + index) % 97}", ""])
+        return "\n".join(lines)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        content = self._respond(prompt)
+        input_tokens, output_tokens = len(prompt) // 4 + 1, len(content) // 4 + 1
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens,
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class ReplayMiss(RuntimeError):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def replay_only_client():
+
+    """ChatGroq subclass that only answers from the LLM cache; any call that
+    reaches the model raises ReplayMiss instead of sending a request. It
+    keeps the ChatGroq class name and namespace, so its serialised form, and
+    with it the cache key, matches that of the recorded client."""
+
+    from langchain_groq import ChatGroq as GroqClient
+
+    def miss(self, messages: List[BaseMessage], *args: Any, **kwargs: Any):
+        prompt = "\n".join(str(message.content) for message in messages)
+        raise ReplayMiss(f"No recorded response for a {len(prompt)}-character prompt to {self.model_name}")
+
+    async def amiss(self, messages: List[BaseMessage], *args: Any, **kwargs: Any):
+        miss(self, messages)
+
+    async def astream_miss(self, messages: List[BaseMessage], *args: Any, **kwargs: Any):
+        miss(self, messages)
+        yield
+
+    return type("ChatGroq", (GroqClient,), {
+        "__module__": __name__,
+        "_generate": miss,
+        "_agenerate": amiss,
+        "_stream": miss,
+        "_astream": astream_miss,
+    })
@@ -0,0 +1,39 @@
+import os
+import stat
+import tempfile
+
+
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import: os.umask can only be read by setting it, which would
+# race with files other threads create later on.
+UMASK = _read_umask()
+
+
+def atomic_write(path: str, content: str) -> None:
+
+    """Writes text to path through a temporary file in the same directory and
+    renames it into place, so readers never see a half-written file. The file
+    keeps the mode of the file it replaces, or gets the umask default that
+    open() would give a new file (mkstemp alone would leave it 0600)."""
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
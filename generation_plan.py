@@ -0,0 +1,144 @@
+import os
+import re
+import ast
+from collections import Counter
+from typing import Dict, List, Set
+
+
+def module_name(file_path: str) -> str:
+
+    """Dotted import path of a Python file ("app/models/user.py" -> "app.models.user")."""
+
+    parts = file_path.replace("\\", "/")[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(part for part in parts if part)
+
+
+def _references(file_path: str, basenames: Counter) -> List[str]:
+
+    """Spellings under which a description can refer to file_path."""
+
+    path = file_path.replace("\\", "/")
+    dotted = module_name(path)
+    names = {path, dotted}
+    if "." in dotted:
+        names.add(".".join(dotted.split(".")[-2:]))
+        names.add("/".join(path.split("/")[-2:]))
+    if basenames[os.path.basename(path)] == 1:
+        names.add(os.path.basename(path))
+    # A bare word such as "app" or "main" is too ambiguous in prose.
+    return sorted((name for name in names if "." in name or "/" in name), key=len, reverse=True)
+
+
+def dependency_graph(file_structure: List[str], file_descriptions: Dict[str, str]) -> Dict[str, Set[str]]:
+
+    """Maps every file to the Python files its description mentions, by path,
+    module path or unambiguous file name."""
+
+    python_files = [path for path in file_structure if path.endswith(".py")]
+    basenames = Counter(os.path.basename(path) for path in python_files)
+    patterns = {
+        path: re.compile(r"(?<![\w./])(" + "|".join(re.escape(name) for name in _references(path, basenames)) + r")(?![\w/]|\.\w)")
+        for path in python_files
+    }
+    graph = {}
+    for file_path in file_structure:
+        description = file_descriptions.get(file_path, "") or ""
+        graph[file_path] = {
+            path for path, pattern in patterns.items()
+            if path != file_path and pattern.search(description)
+        }
+    return graph
+
+
+def topological_waves(files: List[str], graph: Dict[str, Set[str]]) -> List[List[str]]:
+
+    """Orders files into waves whose dependencies among files were all
+    generated by an earlier wave. Dependencies outside files are treated as
+    already available. A dependency cycle is broken by generating one of its
+    files alone, so every file is still scheduled exactly once."""
+
+    pending = {path: set(graph.get(path, ())) & set(files) for path in files}
+    waves = []
+    while pending:
+        wave = [path for path in files if path in pending and not pending[path]]
+        if not wave:
+            # Every pending file waits on another: walk the dependencies
+            # until a file repeats, which puts it on a cycle, and start there.
+            seen = []
+            path = next(path for path in files if path in pending)
+            while path not in seen:
+                seen.append(path)
+                path = min(pending[path], key=files.index)
+            wave = [path]
+        waves.append(wave)
+        for path in wave:
+            del pending[path]
+        for deps in pending.values():
+            deps.difference_update(wave)
+    return waves
+
+
+def _signature(node) -> str:
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    decorators = "".join(f"@{ast.unparse(decorator)}\n" for decorator in node.decorator_list)
+    return f"{decorators}{prefix} {node.name}({ast.unparse(node.args)}){returns}: ..."
+
+
+def _indent(text: str) -> str:
+    return "\n".join(f"    {line}" for line in text.splitlines())
+
+
+def interface_summary(source: str) -> str:
+
+    """Class and function signatures, class fields and module-level names of
+    a module, without bodies. Empty when the module does not parse."""
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return ""
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            lines.append(_signature(node))
+        elif isinstance(node, ast.ClassDef):
+            bases = ", ".join(ast.unparse(base) for base in node.bases + node.keywords)
+            members = []
+            for item in node.body:
+                if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
+                    members.append(f"{item.target.id}: {ast.unparse(item.annotation)}")
+                elif isinstance(item, ast.Assign) and all(isinstance(target, ast.Name) for target in item.targets):
+                    members.append(f"{', '.join(target.id for target in item.targets)} = ...")
+                elif isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and (
+                        not item.name.startswith("_") or item.name == "__init__"):
+                    members.append(_signature(item))
+            lines.append(f"class {node.name}({bases}):" if bases else f"class {node.name}:")
+            lines.append(_indent("\n".join(members) or "..."))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            lines.append(f"{node.target.id}: {ast.unparse(node.annotation)}")
+        elif isinstance(node, ast.Assign):
+            names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+            if names and not any(name.startswith("_") for name in names):
+                value = ast.unparse(node.value)
+                lines.append(f"{' = '.join(names)} = {value if len(value) <= 60 else '...'}")
+    return "\n".join(lines)
+
+
+def dependency_context(folder_path: str, dependencies: List[str]) -> str:
+
+    """Interface summaries of the given project files, one block per file
+    headed by the module to import it from."""
+
+    blocks = []
+    for file_path in sorted(dependencies):
+        full_path = os.path.join(folder_path, file_path)
+        if not os.path.isfile(full_path):
+            continue
+        with open(full_path, "r", encoding="utf-8", errors="replace") as f:
+            summary = interface_summary(f.read())
+        if summary:
+            blocks.append(f"# {file_path} (import from {module_name(file_path)})\n{summary}")
+    return "\n\n".join(blocks)
@@ -0,0 +1,323 @@
+import os
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from fs_utils import atomic_write
+from metrics import METRICS
+from checkpoints import checkpoint_path, checkpoints_enabled, thread_config
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def to_stream_event(event: dict):
+
+    """Maps a LangGraph astream_events event onto the payload sent to clients:
+    node transitions, LLM tokens and the custom progress events emitted by the
+    workflow nodes. Everything else is dropped."""
+
+    kind = event["event"]
+    node = event.get("metadata", {}).get("langgraph_node")
+    if kind in ("on_chain_start", "on_chain_end") and event["name"] == node:
+        return {"event": "node_start" if kind == "on_chain_start" else "node_end", "node": node}
+    if kind == "on_chat_model_stream":
+        text = event["data"]["chunk"].content
+        file_path = event.get("metadata", {}).get("file_path")
+        return {"event": "token", "node": node, "file_path": file_path, "text": text} if text else None
+    if kind == "on_custom_event":
+        return {"event": event["name"], "node": node, **event["data"]}
+    return None
+
+
+class JobQueue:
+
+    """SQLite-backed queue of workflow runs served by background worker threads.
+
+    Every job gets its own working directory under root holding its SRS text and
+    the generated project, so concurrent uploads never share files. Stream events
+    of running jobs are kept in memory for /jobs/{id}/events subscribers.
+
+    Several processes may share one root: a job is claimed with a conditional
+    UPDATE, and a running job is only re-queued once its owner has stopped
+    refreshing its heartbeat for heartbeat_timeout seconds."""
+
+    def __init__(self, root: str = "jobs", workers: int = 2, history: int = 10000, kept_streams: int = 32,
+                 heartbeat_timeout: float = 60.0):
+        self.root = root
+        self.workers = workers
+        self.history = history
+        self.heartbeat_timeout = heartbeat_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._job_ready = threading.Condition()
+        self._event_added = threading.Condition()
+        self._finished = deque(maxlen=kept_streams)
+        self._events: Dict[str, deque] = {}
+        self._offsets: Dict[str, int] = {}
+        self._cancelled = set()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._beat_stop = threading.Event()
+        self._conn = sqlite3.connect(os.path.join(root, "jobs.sqlite"), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, work_dir TEXT NOT NULL, "
+            "zip_path TEXT, error TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+            "owner TEXT, heartbeat REAL)"
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.commit()
+
+    def start(self) -> None:
+        self._stopping = False
+        self._beat_stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._beat_stop.set()
+        with self._job_ready:
+            self._job_ready.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def submit(self, srs_text: str) -> str:
+
+        """Creates a job directory holding the SRS text and queues the job."""
+
+        job_id, work_dir = self._new_job_dir()
+        atomic_write(os.path.join(work_dir, "extracted_text.txt"), srs_text)
+        return self._enqueue(job_id, work_dir)
+
+    def submit_files(self, text_path: str, outline_path: str = None) -> str:
+
+        """Queues a job for an SRS already extracted to disk, moving the
+        extracted text (and its section outline) into the job directory."""
+
+        job_id, work_dir = self._new_job_dir()
+        os.replace(text_path, os.path.join(work_dir, "extracted_text.txt"))
+        if outline_path:
+            os.replace(outline_path, os.path.join(work_dir, "outline.json"))
+        return self._enqueue(job_id, work_dir)
+
+    def _new_job_dir(self):
+        job_id = uuid.uuid4().hex
+        work_dir = os.path.join(self.root, job_id)
+        os.makedirs(work_dir, exist_ok=True)
+        return job_id, work_dir
+
+    def _enqueue(self, job_id: str, work_dir: str) -> str:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, work_dir, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, work_dir, time.time()),
+            )
+            self._conn.commit()
+        with self._job_ready:
+            self._job_ready.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+
+        """Cancels a queued job right away; a running job stops before its next
+        workflow step."""
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            self._conn.commit()
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row and row["status"] == "running":
+                self._cancelled.add(job_id)
+        return self.get(job_id)
+
+    def _update(self, job_id: str, **fields) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def _beat(self) -> None:
+
+        """Refreshes the heartbeat of the jobs this queue is running."""
+
+        while not self._beat_stop.wait(self.heartbeat_timeout / 4):
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status = 'running'", (time.time(), self.owner)
+                )
+                self._conn.commit()
+
+    def _requeue_orphans(self) -> None:
+
+        """Puts running jobs whose owner stopped its heartbeat, for example
+        after a crash or restart, back on the queue. Caller holds _lock."""
+
+        self._conn.execute(
+            "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL, heartbeat = NULL "
+            "WHERE status = 'running' AND (heartbeat IS NULL OR heartbeat < ?)",
+            (time.time() - self.heartbeat_timeout,),
+        )
+
+    def _claim(self) -> Optional[dict]:
+
+        """Takes the oldest queued job. The UPDATE only succeeds while the job
+        is still queued, so a job taken by another process is skipped."""
+
+        with self._lock:
+            self._requeue_orphans()
+            self._conn.commit()
+            while True:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, owner = ?, heartbeat = ? "
+                    "WHERE id = ? AND status = 'queued'",
+                    (now, self.owner, now, row["id"]),
+                ).rowcount
+                self._conn.commit()
+                if claimed:
+                    return dict(row)
+
+    def _work(self) -> None:
+        while not self._stopping:
+            job = self._claim()
+            if job is None:
+                with self._job_ready:
+                    self._job_ready.wait(timeout=1)
+                continue
+            self._run(job)
+
+    def _run(self, job: dict) -> None:
+        from agentic import build_initial_state
+
+        job_id = job["id"]
+        with open(os.path.join(job["work_dir"], "extracted_text.txt"), "r", encoding="utf-8") as f:
+            srs_text = f.read()
+        initial_state = build_initial_state(srs_text, os.path.join(job["work_dir"], "project"))
+        try:
+            final_state = asyncio.run(self._stream(job_id, initial_state))
+            METRICS.save_run_report(job_id, final_state)
+            self._update(job_id, status="succeeded", zip_path=(final_state or {}).get("zip_path"),
+                         finished_at=time.time())
+            self.publish(job_id, {"event": "done"})
+        except JobCancelled:
+            self._update(job_id, status="cancelled", finished_at=time.time())
+            self.publish(job_id, {"event": "cancelled"})
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            self.publish(job_id, {"event": "error", "detail": str(e)})
+        finally:
+            self._cancelled.discard(job_id)
+            self.publish(job_id, None)
+            self._forget_oldest_stream(job_id)
+
+    def _forget_oldest_stream(self, job_id: str) -> None:
+
+        """Keeps the event history of the last kept_streams finished jobs only."""
+
+        with self._event_added:
+            if len(self._finished) == self._finished.maxlen:
+                oldest = self._finished[0]
+                self._events.pop(oldest, None)
+                self._offsets.pop(oldest, None)
+            self._finished.append(job_id)
+
+    async def _stream(self, job_id: str, initial_state: dict) -> Optional[dict]:
+
+        """Drives the workflow for one job, publishing its stream events and
+        returning the final state. The job id doubles as the checkpoint thread
+        id, so a job re-queued after a crash resumes where it stopped."""
+
+        from agentic import build_workflow, get_workflow
+
+        # Jobs run unattended, so improve_code never waits on stdin.
+        config = thread_config(job_id)
+        config["configurable"]["interactive"] = False
+        if checkpoints_enabled():
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+            async with AsyncSqliteSaver.from_conn_string(checkpoint_path()) as saver:
+                workflow = build_workflow(checkpointer=saver)
+                snapshot = await workflow.aget_state(config)
+                if snapshot.next:
+                    self.publish(job_id, {"event": "resumed", "nodes": list(snapshot.next)})
+                    initial_state = None
+                return await self._consume(job_id, workflow, initial_state, config)
+        return await self._consume(job_id, get_workflow(), initial_state, config)
+
+    async def _consume(self, job_id: str, workflow, initial_state: Optional[dict], config: dict) -> Optional[dict]:
+        final_state = None
+        async for event in workflow.astream_events(initial_state, config, version="v2"):
+            if job_id in self._cancelled:
+                raise JobCancelled(job_id)
+            if event["event"] == "on_chain_end" and not event.get("parent_ids"):
+                final_state = event["data"].get("output")
+            payload = to_stream_event(event)
+            if payload:
+                self.publish(job_id, payload)
+        return final_state
+
+    def publish(self, job_id: str, payload: Optional[dict]) -> None:
+
+        """Appends a stream event for a job; None marks the end of the stream."""
+
+        with self._event_added:
+            events = self._events.setdefault(job_id, deque(maxlen=self.history))
+            if len(events) == events.maxlen:
+                self._offsets[job_id] = self._offsets.get(job_id, 0) + 1
+            events.append(payload)
+            self._event_added.notify_all()
+
+    def events_since(self, job_id: str, cursor: int, timeout: float = 1.0):
+
+        """Returns (events, next_cursor) published after cursor, waiting up to
+        timeout for new ones. Events older than the history window are skipped."""
+
+        with self._event_added:
+            offset = self._offsets.get(job_id, 0)
+            events = self._events.get(job_id, ())
+            if cursor - offset >= len(events):
+                self._event_added.wait(timeout=timeout)
+                offset = self._offsets.get(job_id, 0)
+                events = self._events.get(job_id, ())
+            start = max(cursor - offset, 0)
+            return list(events)[start:], offset + len(events)
+
+
+def queue_from_env() -> JobQueue:
+    return JobQueue(
+        root=os.getenv("JOBS_ROOT", "jobs"),
+        workers=int(os.getenv("JOB_WORKERS", "2")),
+        heartbeat_timeout=float(os.getenv("JOB_HEARTBEAT_TIMEOUT", "60")),
+    )
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import ChatGeneration, Generation
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+
+    """Content address of an LLM call. llm_string carries the model name,
+    temperature and the other invocation parameters."""
+
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def _dump_generations(generations) -> str:
+    payload = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            payload.append({"message": message_to_dict(generation.message)})
+        else:
+            payload.append({"text": generation.text})
+    return json.dumps(payload)
+
+
+def _load_generations(value: str):
+    generations = []
+    for item in json.loads(value):
+        if "message" in item:
+            generations.append(ChatGeneration(message=messages_from_dict([item["message"]])[0]))
+        else:
+            generations.append(Generation(text=item["text"]))
+    return generations
+
+
+class TieredLLMCache(BaseCache):
+
+    """LLM response cache with an in-memory LRU tier in front of a SQLite file.
+
+    Entries expire after ttl seconds (0 disables expiry) and the on-disk tier is
+    trimmed to max_bytes of stored responses, least recently used first.
+    on_lookup, if set, is called with True or False after every lookup."""
+
+    def __init__(self, path: str = ".llm_cache.sqlite", memory_size: int = 256,
+                 ttl: float = 0, max_bytes: int = 0):
+        self.path = path
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self.on_lookup = None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.time() - created_at > self.ttl
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str):
+        generations = self._lookup(prompt, llm_string)
+        if self.on_lookup:
+            self.on_lookup(generations is not None)
+        return generations
+
+    def _lookup(self, prompt: str, llm_string: str):
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and not self._expired(entry[1]):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return _load_generations(entry[0])
+            self._memory.pop(key, None)
+
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1]):
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.stats["evictions"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self._remember(key, row[0], row[1])
+            self.stats["disk_hits"] += 1
+            return _load_generations(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        key = cache_key(prompt, llm_string)
+        value = _dump_generations(return_val)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._remember(key, value, now)
+            self.stats["writes"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+
+        """Drops expired rows, then the least recently used rows until the
+        on-disk tier fits in max_bytes."""
+
+        if self.ttl:
+            cursor = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            self.stats["evictions"] += cursor.rowcount
+        if not self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self.stats["evictions"] += 1
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def hits(self) -> int:
+        return self.stats["memory_hits"] + self.stats["disk_hits"]
+
+    def summary(self) -> str:
+        return (f"LLM cache: {self.hits()} hits ({self.stats['memory_hits']} memory, "
+                f"{self.stats['disk_hits']} disk), {self.stats['misses']} misses, "
+                f"{self.stats['evictions']} evictions")
+
+
+def cache_from_env() -> Optional[TieredLLMCache]:
+
+    """Builds the shared cache from LLM_CACHE_* environment variables, or None
+    when LLM_CACHE is switched off."""
+
+    if os.getenv("LLM_CACHE", "true").lower() in ("0", "false", "no"):
+        return None
+    return TieredLLMCache(
+        path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+        memory_size=int(os.getenv("LLM_CACHE_MEMORY_SIZE", "256")),
+        ttl=float(os.getenv("LLM_CACHE_TTL", "0")),
+        max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", "0")),
+    )
@@ -0,0 +1,101 @@
+import os
+import time
+import importlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+
+# Transient errors per provider SDK that are worth retrying with backoff.
+PROVIDER_RETRY_ERRORS = {
+    "groq": ["RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError"],
+    "openai": ["RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError"],
+}
+
+
+def retryable_errors() -> tuple:
+
+    """Collects the retryable exception types of every installed provider SDK."""
+
+    errors = [TimeoutError, ConnectionError]
+    for provider, names in PROVIDER_RETRY_ERRORS.items():
+        try:
+            module = importlib.import_module(provider)
+        except ImportError:
+            continue
+        errors.extend(getattr(module, name) for name in names if hasattr(module, name))
+    return tuple(errors)
+
+
+def rate_limit_errors() -> tuple:
+
+    """The rate-limit exception types of every installed provider SDK."""
+
+    errors = []
+    for provider in PROVIDER_RETRY_ERRORS:
+        try:
+            module = importlib.import_module(provider)
+        except ImportError:
+            continue
+        if hasattr(module, "RateLimitError"):
+            errors.append(module.RateLimitError)
+    return tuple(errors)
+
+
+def with_backoff(model):
+
+    """Wraps a chat model so rate-limited calls are retried with exponential
+    backoff and jitter instead of failing the whole node."""
+
+    return model.with_retry(
+        retry_if_exception_type=retryable_errors(),
+        wait_exponential_jitter=True,
+        stop_after_attempt=int(os.getenv("LLM_MAX_ATTEMPTS", "5")),
+    )
+
+
+def invoke_all(model, prompts: List[str], max_concurrency: int = None, label: str = "llm",
+               on_result: Optional[Callable[[int, str], None]] = None,
+               keys: Optional[List[str]] = None) -> List[str]:
+
+    """Sends every prompt to the model across a bounded thread pool and returns
+    the response contents in the same order as the prompts. on_result, if
+    given, is called with (index, content) as soon as each response arrives.
+    keys (usually file paths) are attached to each call's metadata as
+    file_path so streamed tokens can be told apart.
+
+    Prints the wall-clock time next to the summed per-call latency, which is
+    what the sequential path would have taken."""
+
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("MAX_CONCURRENCY", "4"))
+    max_concurrency = max(1, min(max_concurrency, len(prompts) or 1))
+    runnable = with_backoff(model)
+
+    def timed_invoke(index, prompt):
+        config = {"metadata": {"file_path": keys[index]}} if keys else None
+        started = time.perf_counter()
+        content = runnable.invoke(prompt, config=config).content.strip()
+        latency = time.perf_counter() - started
+        if on_result:
+            on_result(index, content)
+        return content, latency
+
+    # Each worker runs in a copy of the caller's context so LangChain callbacks
+    # (tracing, astream_events token streaming) follow the call into the pool.
+    contexts = [contextvars.copy_context() for _ in prompts]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        results = list(pool.map(
+            lambda index: contexts[index].run(timed_invoke, index, prompts[index]),
+            range(len(prompts)),
+        ))
+    wall_time = time.perf_counter() - started
+
+    sequential_time = sum(latency for _, latency in results)
+    speedup = sequential_time / wall_time if wall_time else 1.0
+    print(f"[{label}] {len(prompts)} calls with {max_concurrency} workers: "
+          f"{wall_time:.2f}s wall vs {sequential_time:.2f}s sequential ({speedup:.1f}x)")
+
+    return [content for content, _ in results]
@@ -1,16 +1,36 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 import os
-from fastapi.responses import JSONResponse
-from docx import Document
-import io
-import shutil
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+import zipfile
+import tempfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
 from dotenv import load_dotenv
+from jobs import queue_from_env
+from docx_stream import extract_docx
+from metrics import METRICS
+from artifacts import (RangeNotSatisfiable, archive_etag, cached_archive, collect_files, compression_level, iter_zip,
+                       parse_byte_range)
 
 
 load_dotenv()
+
+job_queue = queue_from_env()
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue.start()
+    yield
+    job_queue.stop()
+
  
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
  
  
  
@@ -27,40 +47,175 @@ async def Hello_world():
 async def upload_docx(file: UploadFile = File(...)):
  
     """
-    Takes a .docx file as input and returns the text from the document.
+    Takes a .docx file as input, extracts its paragraphs, headings and tables
+    and queues a generation job for it in its own working directory.
+    The upload is spooled to disk in chunks and the document XML is streamed,
+    so memory use does not grow with the size of the document.
     Returns:
-        str: The text extracted from the .docx document.
+        dict: The job id, the section outline and the extracted size.
     """
  
     if file.content_type != "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
         return JSONResponse(content={"error": "Invalid file type"}, status_code=400)
-    contents = await file.read()
-    document = Document(io.BytesIO(contents))
-    doc_text = []
-    for paragraph in document.paragraphs:
-        doc_text.append(paragraph.text)
-    text_content = "\n".join(doc_text)
-    text = {"content": "\n".join(doc_text)}
-    with open("extracted_text.txt", "w",encoding="utf-8") as f:
-        f.write(text_content)
-    return text
+
+    os.makedirs(job_queue.root, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=job_queue.root) as spool_dir:
+        docx_path = os.path.join(spool_dir, "upload.docx")
+        with open(docx_path, "wb") as spool:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+
+        text_path = os.path.join(spool_dir, "extracted_text.txt")
+        outline_path = os.path.join(spool_dir, "outline.json")
+        try:
+            extracted = await asyncio.to_thread(extract_docx, docx_path, text_path, outline_path)
+        except (zipfile.BadZipFile, KeyError, ET.ParseError):
+            return JSONResponse(content={"error": "Invalid .docx file"}, status_code=400)
+
+        job_id = job_queue.submit_files(text_path, outline_path)
+
+    return {"job_id": job_id, **extracted}
  
 
 
-from fastapi.responses import FileResponse
+
+def _read_file(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_download(request: Request, path: str, filename: str, etag: str = None):
+
+    """Serves a finished archive with ETag, If-None-Match and resumable
+    single Range requests (If-Range aware)."""
+
+    stat = os.stat(path)
+    etag = etag or f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes",
+               "Content-Disposition": f'attachment; filename="{filename}"'}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if request.headers.get("range") and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_byte_range(request.headers["range"], stat.st_size)
+        except RangeNotSatisfiable:
+            raise HTTPException(status_code=416, detail="Range not satisfiable.",
+                                headers={"Content-Range": f"bytes */{stat.st_size}"})
+    if byte_range is None:
+        headers["Content-Length"] = str(stat.st_size)
+        return StreamingResponse(_read_file(path, 0, stat.st_size - 1), media_type="application/zip", headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(_read_file(path, start, end), status_code=206, media_type="application/zip",
+                             headers=headers)
+
 
 @app.get("/download")
-def download_zip():
+def download_zip(request: Request):
     """
-    Streams back the ZIP file named `generated_project_root.zip`
-    from the current working directory.
+    Streams back the project generated in FOLDER_PATH as a ZIP file, built
+    while it is sent. Range requests are served from a cached copy of the
+    archive next to the folder, which is rebuilt only when the files change.
     """
-    zip_path = os.getenv("FOLDER_PATH")
-    
-    if not os.path.isfile(zip_path):
+    folder = os.getenv("FOLDER_PATH")
+
+    if not folder or not os.path.isdir(folder):
+        raise HTTPException(status_code=404, detail="Project folder not found.")
+    files = collect_files(folder)
+    level = compression_level()
+    etag = archive_etag(folder, files, level)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if request.headers.get("range"):
+        etag = cached_archive(folder, f"{folder}.zip", files, level)
+        return file_download(request, f"{folder}.zip", "project.zip", etag)
+    return StreamingResponse(
+        iter_zip(folder, files, level),
+        media_type="application/zip",
+        headers={"ETag": etag, "Accept-Ranges": "bytes", "Content-Disposition": 'attachment; filename="project.zip"'},
+    )
+
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+
+    """Returns the status of a job: queued, running, succeeded, failed or cancelled."""
+
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str):
+
+    """Streams node transitions, LLM tokens and written files of a job as
+    server-sent events until the job finishes."""
+
+    if job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    async def event_source():
+        cursor = 0
+        while True:
+            events, cursor = await asyncio.to_thread(job_queue.events_since, job_id, cursor)
+            for payload in events:
+                if payload is None:
+                    return
+                yield f"event: {payload['event']}\ndata: {json.dumps(payload)}\n\n"
+            if not events and job_queue.get(job_id)["status"] in ("succeeded", "failed", "cancelled"):
+                return
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+
+    """Cancels a job. A queued job never starts; a running job finishes the
+    node in progress and stops."""
+
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@app.get("/jobs/{job_id}/download")
+def download_job(job_id: str, request: Request):
+
+    """Streams back the generated project of a finished job as a ZIP file,
+    with ETag and Range support for resumed downloads."""
+
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job["status"] != "succeeded" or not job["zip_path"] or not os.path.isfile(job["zip_path"]):
         raise HTTPException(status_code=404, detail="ZIP file not found.")
-    return FileResponse(
-        path=zip_path,
-        filename="project.zip",
-        media_type="application/zip"
-    )
\ No newline at end of file
+    etag = None
+    if os.path.isfile(f"{job['zip_path']}.etag"):
+        with open(f"{job['zip_path']}.etag", "r", encoding="utf-8") as f:
+            etag = f.read().strip() or None
+    return file_download(request, job["zip_path"], f"project-{job_id}.zip", etag)
+
+
+@app.get("/metrics")
+def metrics():
+
+    """Exposes per-node latency, LLM call latency, token counts, cache hits
+    and retries in the Prometheus text format."""
+
+    return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
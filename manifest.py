@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+from typing import Dict, List
+
+from fs_utils import atomic_write
+
+
+MANIFEST_NAME = ".agentic_manifest.json"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _file_hash(path: str) -> str:
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return content_hash(f.read())
+
+
+def test_path_for(file_path: str) -> str:
+
+    """Relative path of the test file generate_tests writes for file_path,
+    named after its whole path ("app/routes/x.py" -> "tests/test_app_routes_x.py")
+    so modules sharing a basename get separate tests."""
+
+    stem = file_path.replace("\\", "/")
+    stem = stem[:-3] if stem.endswith(".py") else stem
+    return os.path.join("tests", "test_" + stem.replace("/", "_") + ".py")
+
+
+def source_for_test(test_path: str, file_structure: List[str]) -> str:
+
+    """The file in file_structure whose test is test_path, or test_path
+    itself for a test that belongs to no generated file."""
+
+    wanted = os.path.normpath(test_path)
+    return next((file_path for file_path in file_structure if os.path.normpath(test_path_for(file_path)) == wanted),
+                test_path)
+
+
+def load_manifest(folder_path: str) -> Dict[str, Dict[str, str]]:
+
+    """Reads the manifest kept next to the generated project, or an empty one."""
+
+    path = os.path.join(folder_path, MANIFEST_NAME)
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(folder_path: str, file_structure: List[str], file_descriptions: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+
+    """Records the description and code hash of every generated file."""
+
+    manifest = {}
+    for file_path in file_structure:
+        manifest[file_path] = {
+            "description_hash": content_hash(file_descriptions.get(file_path, "")),
+            "code_hash": _file_hash(os.path.join(folder_path, file_path)),
+        }
+    atomic_write(os.path.join(folder_path, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def changed_files(folder_path: str, file_structure: List[str], file_descriptions: Dict[str, str]) -> List[str]:
+
+    """Returns the files that are new, whose description changed since the last
+    run, or whose generated code is missing on disk or no longer matches the
+    code recorded at the end of the last run."""
+
+    manifest = load_manifest(folder_path)
+    changed = []
+    for file_path in file_structure:
+        entry = manifest.get(file_path)
+        code_hash = _file_hash(os.path.join(folder_path, file_path))
+        if (
+            entry is None
+            or entry.get("description_hash") != content_hash(file_descriptions.get(file_path, ""))
+            or code_hash is None
+            or (entry.get("code_hash") is not None and entry["code_hash"] != code_hash)
+        ):
+            changed.append(file_path)
+    return changed
+
+
+def prune_removed(folder_path: str, file_structure: List[str]) -> List[str]:
+
+    """Deletes the code and test files of entries that are in the manifest but
+    no longer in file_structure, so they are neither zipped nor tested, as
+    well as tests still named after a basename only (tests/test_<name>.py),
+    as earlier runs wrote them. Returns the removed relative paths. An empty
+    file_structure never prunes anything, since it means the structure could
+    not be produced."""
+
+    if not file_structure:
+        return []
+    kept = set(file_structure)
+    kept_tests = {test_path_for(file_path) for file_path in file_structure}
+    removed = []
+    for file_path in load_manifest(folder_path):
+        candidates = [] if file_path in kept else [file_path, test_path_for(file_path)]
+        candidates.append(os.path.join("tests", "test_" + os.path.basename(file_path)))
+        for relative in dict.fromkeys(path for path in candidates if path not in kept_tests):
+            full_path = os.path.join(folder_path, relative)
+            if os.path.isfile(full_path):
+                os.remove(full_path)
+                removed.append(relative)
+    return removed
@@ -0,0 +1,224 @@
+import json
+import time
+import functools
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from fs_utils import atomic_write
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Metrics:
+
+    """Process-wide counters and latency histograms for the workflow, plus a
+    per-run breakdown keyed by thread id for the JSON run report."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = defaultdict(float)
+        self._histograms: Dict[Tuple[str, Tuple], list] = {}
+        self._runs: Dict[str, dict] = {}
+
+    def inc(self, name: str, labels: dict, value: float = 1) -> None:
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.setdefault(key, [0] * len(LATENCY_BUCKETS) + [0.0, 0])
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def add_to_run(self, thread_id: Optional[str], section: str, node: str, **values) -> None:
+        if thread_id is None:
+            return
+        with self._lock:
+            run = self._runs.setdefault(thread_id, {"thread_id": thread_id, "started_at": time.time(),
+                                                    "nodes": {}, "llm": {}, "prompts": {}})
+            entry = run[section].setdefault(node, defaultdict(float))
+            for name, value in values.items():
+                entry[name] += value
+
+    def record_node(self, node: str, thread_id: Optional[str], seconds: float, failed: bool = False) -> None:
+        self.inc("agentic_node_runs_total", {"node": node, "status": "error" if failed else "ok"})
+        self.observe("agentic_node_duration_seconds", {"node": node}, seconds)
+        self.add_to_run(thread_id, "nodes", node, runs=1, seconds=seconds, errors=int(failed))
+
+    def run_report(self, thread_id: str) -> dict:
+
+        """Per-node wall time, LLM usage and locally counted prompt tokens
+        (total and shared prefix) of one run, with totals."""
+
+        with self._lock:
+            run = self._runs.get(thread_id, {"thread_id": thread_id, "nodes": {}, "llm": {}, "prompts": {}})
+            report = {
+                "thread_id": thread_id,
+                "nodes": {node: dict(values) for node, values in run["nodes"].items()},
+                "llm": {node: dict(values) for node, values in run["llm"].items()},
+                "prompts": {node: dict(values) for node, values in run["prompts"].items()},
+            }
+        totals = defaultdict(float)
+        for values in report["llm"].values():
+            for name, value in values.items():
+                totals[name] += value
+        report["llm_totals"] = dict(totals)
+        report["wall_seconds"] = sum(values.get("seconds", 0) for values in report["nodes"].values())
+        return report
+
+    def save_run_report(self, thread_id: str, state: dict) -> Optional[str]:
+
+        """Writes the run report next to the generated zip (or project folder)
+        and forgets the run."""
+
+        target = (state or {}).get("zip_path") or (state or {}).get("folder_path")
+        if not target:
+            return None
+        path = f"{target[:-4] if target.endswith('.zip') else target}.report.json"
+        atomic_write(path, json.dumps(self.run_report(thread_id), indent=2, sort_keys=True))
+        with self._lock:
+            self._runs.pop(thread_id, None)
+        return path
+
+    def render_prometheus(self) -> str:
+
+        """Renders every metric in the Prometheus text exposition format."""
+
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{fmt(labels)} {value:g}")
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), values in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(LATENCY_BUCKETS, values):
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {values[-1]}")
+                lines.append(f"{name}_sum{fmt(labels)} {values[-2]:.6f}")
+                lines.append(f"{name}_count{fmt(labels)} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+# Set by the LLM cache during a lookup and consumed when the same call ends.
+_cache_lookup = threading.local()
+
+
+def record_cache_lookup(hit: bool) -> None:
+    _cache_lookup.hit = hit
+
+
+def current_thread_id() -> Optional[str]:
+    from langgraph.config import get_config
+
+    try:
+        return (get_config().get("configurable") or {}).get("thread_id")
+    except RuntimeError:
+        return None
+
+
+def instrument_node(name: str, fn):
+
+    """Wraps a graph node so its wall time is recorded. functools.wraps keeps
+    the signature, so LangGraph still passes config to nodes that take it."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            METRICS.record_node(name, current_thread_id(), time.perf_counter() - started, failed)
+
+    return wrapper
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+
+    """Records latency, token usage, retries and cache hits of every chat
+    model call, attributed to the graph node and thread it ran in."""
+
+    def __init__(self, metrics: Metrics = METRICS):
+        self.metrics = metrics
+        self._calls: Dict[UUID, tuple] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or "unknown"
+        retry = any(tag.startswith("retry:attempt:") for tag in tags or [])
+        self._calls[run_id] = (time.perf_counter(), metadata.get("langgraph_node", "unknown"),
+                               metadata.get("thread_id"), str(model), retry)
+        _cache_lookup.hit = None
+
+    def _finish(self, run_id: UUID, response=None, error: bool = False):
+        started, node, thread_id, model, retry = self._calls.pop(
+            run_id, (time.perf_counter(), "unknown", None, "unknown", False)
+        )
+        latency = time.perf_counter() - started
+        labels = {"node": node, "model": model}
+        cache_hit = getattr(_cache_lookup, "hit", None)
+        _cache_lookup.hit = None
+
+        prompt_tokens = completion_tokens = 0
+        if response is not None and not cache_hit:
+            usage = {}
+            for generations in response.generations:
+                for generation in generations:
+                    message_usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    usage["input_tokens"] = usage.get("input_tokens", 0) + message_usage.get("input_tokens", 0)
+                    usage["output_tokens"] = usage.get("output_tokens", 0) + message_usage.get("output_tokens", 0)
+            if not any(usage.values()):
+                token_usage = (response.llm_output or {}).get("token_usage") or {}
+                usage = {"input_tokens": token_usage.get("prompt_tokens", 0),
+                         "output_tokens": token_usage.get("completion_tokens", 0)}
+            prompt_tokens, completion_tokens = usage["input_tokens"], usage["output_tokens"]
+
+        self.metrics.inc("agentic_llm_calls_total", {**labels, "status": "error" if error else "ok"})
+        self.metrics.observe("agentic_llm_call_duration_seconds", labels, latency)
+        self.metrics.inc("agentic_llm_prompt_tokens_total", labels, prompt_tokens)
+        self.metrics.inc("agentic_llm_completion_tokens_total", labels, completion_tokens)
+        if retry:
+            self.metrics.inc("agentic_llm_retries_total", labels)
+        if cache_hit is not None:
+            self.metrics.inc("agentic_llm_cache_lookups_total", {**labels, "result": "hit" if cache_hit else "miss"})
+        self.metrics.add_to_run(
+            thread_id, "llm", node,
+            calls=1, seconds=latency, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+            retries=int(retry), errors=int(error), cache_hits=int(bool(cache_hit)),
+            cache_misses=int(cache_hit is False),
+        )
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._finish(run_id, response)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._finish(run_id, error=True)
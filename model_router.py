@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import Callable, Dict, List
+
+from langchain_core.runnables import RunnableLambda
+
+from llm_pool import rate_limit_errors
+
+
+TIERS = ("small", "large")
+
+# Architecture and first drafts need the large model; reviews, test
+# scaffolding and patches start small and escalate for failing files.
+DEFAULT_NODE_TIERS = {
+    "srs_ingest": "small",
+    "srs_to_file_structure": "large",
+    "write_code": "large",
+    "reflect_on_code": "small",
+    "improve_code": "small",
+    "generate_tests": "small",
+    "reflect_on_errors": "small",
+}
+
+
+def _pairs(value: str) -> Dict[str, str]:
+    pairs = {}
+    for item in value.split(","):
+        key, _, setting = item.partition("=")
+        if key.strip() and setting.strip():
+            pairs[key.strip()] = setting.strip()
+    return pairs
+
+
+class ModelRouter:
+
+    """Picks the chat model for each workflow node by tier.
+
+    tiers maps "small"/"large" to model names and node_tiers maps nodes to a
+    tier. Escalated calls move one tier up. Each model is built once by
+    factory, calls to it are capped by its entry in limits, and a
+    rate-limited call is retried at once on the other tiers' models."""
+
+    def __init__(self, tiers: Dict[str, str], node_tiers: Dict[str, str], limits: Dict[str, int],
+                 factory: Callable[[str], object]):
+        self.tiers = tiers
+        self.node_tiers = node_tiers
+        self.limits = limits
+        self.factory = factory
+        self._models: Dict[str, object] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, factory: Callable[[str], object]) -> "ModelRouter":
+
+        """MODEL_SMALL and MODEL_LARGE default to MODEL_NAME, so a single
+        model setup keeps working. NODE_MODEL_TIERS ("node=tier,...")
+        overrides the node defaults and MODEL_CONCURRENCY ("model=n,...")
+        caps concurrent calls per model."""
+
+        default = os.getenv("MODEL_NAME")
+        tiers = {tier: os.getenv(f"MODEL_{tier.upper()}") or default for tier in TIERS}
+        node_tiers = {**DEFAULT_NODE_TIERS, **_pairs(os.getenv("NODE_MODEL_TIERS", ""))}
+        limits = {model: int(limit) for model, limit in _pairs(os.getenv("MODEL_CONCURRENCY", "")).items()}
+        return cls(tiers, node_tiers, limits, factory)
+
+    def tier_for(self, node: str, escalate: bool = False) -> str:
+        tier = self.node_tiers.get(node, TIERS[-1])
+        if escalate and tier in TIERS:
+            tier = TIERS[min(TIERS.index(tier) + 1, len(TIERS) - 1)]
+        return tier
+
+    def model_name(self, node: str, escalate: bool = False) -> str:
+        return self.tiers.get(self.tier_for(node, escalate)) or self.tiers[TIERS[-1]]
+
+    def _limited(self, name: str):
+
+        """The chat model for name, behind its concurrency limit when one is
+        configured."""
+
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self.factory(name)
+                if self.limits.get(name):
+                    self._semaphores[name] = threading.BoundedSemaphore(self.limits[name])
+        model = self._models[name]
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            return model
+
+        def invoke(prompt, config):
+            with semaphore:
+                return model.invoke(prompt, config=config)
+
+        return RunnableLambda(invoke, name=f"limit:{name}")
+
+    def runnable(self, node: str, escalate: bool = False):
+
+        """Model for a node call, falling back to the other tiers' models when
+        it is rate limited."""
+
+        name = self.model_name(node, escalate)
+        fallbacks: List[str] = []
+        for tier in reversed(TIERS):
+            other = self.tiers.get(tier)
+            if other and other != name and other not in fallbacks:
+                fallbacks.append(other)
+        primary = self._limited(name)
+        if not fallbacks:
+            return primary
+        return primary.with_fallbacks([self._limited(other) for other in fallbacks],
+                                      exceptions_to_handle=rate_limit_errors())
@@ -0,0 +1,90 @@
+import os
+import json
+from typing import Dict, List, Optional, Tuple
+
+from srs_ingest import count_tokens, parse_json_response
+
+
+FILE_HEADER = "### FILE: "
+
+
+def batch_budget() -> int:
+
+    """Token budget of one batched prompt; 0 turns batching off."""
+
+    return int(os.getenv("PROMPT_BATCH_BUDGET", "3000"))
+
+
+def batch_max_files() -> int:
+    return int(os.getenv("PROMPT_BATCH_MAX_FILES", "8"))
+
+
+def pack_files(files: List[Tuple[str, str]], budget: int, overhead: int = 0,
+               max_files: int = 8) -> Tuple[List[List[int]], List[int]]:
+
+    """Groups (path, code) pairs into batches of at most budget tokens, the
+    shared instructions (overhead) included. Files larger than a quarter of
+    the budget, and batches left with a single file, keep their own prompt.
+
+    Returns (batches, singles) as indexes into files, in input order."""
+
+    batches, singles = [], []
+    current, used = [], overhead
+    small = max(0, budget - overhead) // 4
+    for index, (path, code) in enumerate(files):
+        tokens = count_tokens(code) + count_tokens(path) + 8
+        if not budget or tokens > small:
+            singles.append(index)
+            continue
+        if current and (used + tokens > budget or len(current) >= max_files):
+            batches.append(current)
+            current, used = [], overhead
+        current.append(index)
+        used += tokens
+    if current:
+        batches.append(current)
+
+    for batch in [batch for batch in batches if len(batch) == 1]:
+        batches.remove(batch)
+        singles.extend(batch)
+    return batches, sorted(singles)
+
+
+def batch_prompt(instructions: str, files: List[Tuple[str, str]], context: str = "") -> List[Tuple[str, str]]:
+
+    """One prompt covering several files, asking for a JSON object keyed by
+    file path. The instructions, the shared context and the answer format go
+    into the system message so it is the same for every batch of a node."""
+
+    sections = [f"{FILE_HEADER}{path}\n```python\n{code}\n```" for path, code in files]
+    paths = ", ".join(f'"{path}"' for path, _ in files)
+    system = "\n\n".join(part for part in (instructions.strip(), context) if part)
+    system += (
+        "\n\nEach value is a single string holding your complete answer for that file."
+        "\nEnsure the response is valid JSON without any additional text."
+    )
+    user = "\n\n".join(sections) + f"\n\nReturn a JSON object keyed by file path with exactly these keys: {paths}."
+    return [("system", system), ("human", user)]
+
+
+def parse_batch_response(text: str, paths: List[str]) -> Optional[Dict[str, str]]:
+
+    """Splits a batched answer back into one answer per path, or returns None
+    when it is not valid JSON or misses a file."""
+
+    body = text.strip()
+    if body.startswith("```"):
+        # Strip the outer fence only; answers may contain fences themselves.
+        body = body.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        answers = json.loads(body)
+    except ValueError:
+        try:
+            answers = parse_json_response(text)
+        except ValueError:
+            return None
+    if not isinstance(answers, dict):
+        return None
+    if not all(isinstance(answers.get(path), str) and answers[path].strip() for path in paths):
+        return None
+    return {path: answers[path] for path in paths}
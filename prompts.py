@@ -0,0 +1,224 @@
+import os
+import string
+import inspect
+import functools
+from typing import List, Tuple, Union
+
+from metrics import METRICS, current_thread_id
+from srs_ingest import count_tokens
+from generation_plan import dependency_context
+
+# A rendered prompt: (role, content) pairs that chat models accept as is.
+Messages = List[Tuple[str, str]]
+
+_prefix_tokens = functools.lru_cache(maxsize=128)(count_tokens)
+
+
+class PromptTemplate:
+
+    """A node's prompt, compiled once at import.
+
+    system holds every static instruction and is sent as the system message,
+    followed by the shared project context, so all calls of a node in a run
+    start with an identical prefix that provider-side prefix caching can
+    reuse. Only the user message carries per-call values. batch is the
+    system text for prompts that cover several files at once."""
+
+    def __init__(self, node: str, system: str, user: str, batch: str = None):
+        self.node = node
+        self.system = inspect.cleandoc(system)
+        self.user = inspect.cleandoc(user)
+        self.batch = inspect.cleandoc(batch) if batch else self.system
+        self.fields = frozenset(name for _, name, _, _ in string.Formatter().parse(self.user) if name)
+
+    def render(self, context: str = "", **values) -> Messages:
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"{self.node} prompt is missing {', '.join(sorted(missing))}")
+        return [("system", with_context(self.system, context)), ("human", self.user.format_map(values))]
+
+
+def with_context(system: str, context: str) -> str:
+    return f"{system}\n\n{context}" if context else system
+
+
+def prompt_text(prompt: Union[str, Messages]) -> str:
+
+    """Plain text of a prompt, used for checkpoint keys and token counts."""
+
+    if isinstance(prompt, str):
+        return prompt
+    return "\n\n".join(content for _, content in prompt)
+
+
+def record_prompt(node: str, prompt: Union[str, Messages]) -> None:
+
+    """Adds a sent prompt's local token counts to the run report: its total
+    and the part in the shared system prefix, which a provider's prefix cache
+    serves after the first call."""
+
+    prefix = "" if isinstance(prompt, str) else "\n\n".join(content for role, content in prompt if role == "system")
+    total = count_tokens(prompt_text(prompt))
+    cached = _prefix_tokens(prefix) if prefix else 0
+    METRICS.add_to_run(current_thread_id(), "prompts", node, calls=1, tokens=total, prefix_tokens=cached)
+
+
+def context_budget() -> int:
+    return int(os.getenv("PROMPT_CONTEXT_BUDGET", "2000"))
+
+
+def project_context(folder_path: str, file_structure: List[str]) -> Tuple[str, bool]:
+
+    """The project block every call of a node shares: the file tree and the
+    interface summaries of the project's Python files. Returns the block and
+    whether it holds all interfaces; past PROMPT_CONTEXT_BUDGET tokens only
+    the tree is shared."""
+
+    block = "Project files:\n" + "\n".join(f"- {file_path}" for file_path in file_structure)
+    interfaces = dependency_context(folder_path, [file_path for file_path in file_structure if file_path.endswith(".py")])
+    if not interfaces:
+        return block, True
+    if count_tokens(interfaces) > context_budget():
+        return block, False
+    return (f"{block}\n\nProject interfaces, import from these modules and call them exactly as declared:\n"
+            f"```python\n{interfaces}\n```"), True
+
+
+WRITE_CODE = PromptTemplate(
+    "write_code",
+    system="""
+    You are a senior FastAPI developer. Generate a complete Python file based **only** on the description you are given.
+    ### **Constraints:**
+    - **Only generate code for the file named in the request.**
+    - **Do not generate code for any other files.**
+    - **Strictly adhere to the extracted requirements from the description.**
+    - **Do not assume or add extra functionality beyond what is specified.**
+    - **Follow FastAPI best practices, keeping the code minimal yet correct.**
+    - **Use clear and concise variable and function names.**
+    - **Ensure modularity and error handling but avoid unnecessary abstractions.**
+    - **Include only relevant docstrings and comments.**
+    - **Do not generate unit tests unless explicitly requested.**
+    - **Do Not Give Anything Like pip installs and everything that is present should be python. Do not give notes as well.**
+    """,
+    user="""
+    File: {file_path}
+    Description:
+    {description}{dependencies}
+    """,
+)
+
+REVIEW_CODE = PromptTemplate(
+    "reflect_on_code",
+    system="""
+    You are a senior software reviewer. Analyze the code you are given:
+    - Identify any missing logic.
+    - Suggest improvements (performance, best practices, security).
+    - List the exact modifications required.
+    """,
+    user="""
+    File: {file_path}
+    ```python
+    {code}
+    ```
+    """,
+    batch="""
+    You are a senior software reviewer. Analyze each of the following files:
+    - Identify any missing logic.
+    - Suggest improvements (performance, best practices, security).
+    - List the exact modifications required.
+    """,
+)
+
+IMPROVE_REWRITE = PromptTemplate(
+    "improve_code",
+    system="""
+    You are a senior software engineer. Improve the Python code you are given based on the feedback for it.
+    ### **Constraints:**
+    - **Only generate code for the file named in the request.**
+    - **Do not generate code for any other files.**
+    - **Strictly adhere to the extracted requirements from the description.**
+    - **Do not assume or add extra functionality beyond what is specified.**
+    - **Follow FastAPI best practices, keeping the code minimal yet correct.**
+    - **Use clear and concise variable and function names.**
+    - **Ensure modularity and error handling but avoid unnecessary abstractions.**
+    - **Include only relevant docstrings and comments.**
+    - **Do not generate unit tests unless explicitly requested.**
+    - **Do Not Give Anything Like pip installs and everything that is present should be python. Do not give notes as well.**
+    - **Do Not Add Any Thing Likes notes anything extra strict give only the python code**
+    -- *** DO NOT MENTION ANYTHING ELSE OTHER THAN PYTHON IN THE FILE I DONT WANT YOUR ASUPTIONS AND EVERY THING ELSE SHOULD NOT BE PRESENT NO EXTRA TEXT SHOULD BE PRESENT***
+    """,
+    user="""
+    File: {file_path}
+    ```python
+    {code}
+    ```
+    Feedback:
+    ```
+    {feedback}
+    ```
+    """,
+)
+
+IMPROVE_PATCH = PromptTemplate(
+    "improve_code",
+    system="""
+    You are a senior software engineer. Improve the file you are given based on the feedback for it.
+    - Answer only with edits in this exact format, one block per edit:
+    <<<<<<< SEARCH
+    exact lines copied from the file
+    =======
+    the lines that replace them
+    >>>>>>> REPLACE
+    - Each SEARCH text must match the file exactly, including indentation, and occur only once.
+    - Keep each block small; do not repeat unchanged code beyond what makes the SEARCH text unique.
+    - Do not assume or add extra functionality beyond what the feedback asks for.
+    - If nothing needs to change, answer NO_CHANGES.
+    """,
+    user=IMPROVE_REWRITE.user,
+)
+
+GENERATE_TESTS = PromptTemplate(
+    "generate_tests",
+    system="""
+    You are a senior software tester.
+    Based on the functionality of the Python module you are given, generate a complete test case file using a Python testing framework (unittest or pytest).
+    Ensure the tests cover core functionality, error handling, and potential edge cases.
+    **Constraints:**
+    - **Only generate code for this specific file.**
+    - **Do not generate code for any other files.**
+    - **Do not assume or add extra functionality beyond what is specified.**
+    - **Use clear and concise variable and function names.**
+    - **Ensure modularity and error handling but avoid unnecessary abstractions.**
+    - **Include only relevant docstrings and comments.**
+    - **Do Not Give Anything Like pip installs and everything that is present should be python. Do not give notes as well.**
+    - **Do Not Add Any Thing Likes notes anything extra strict give only the python code**
+    -- *** DO NOT MENTION ANYTHING ELSE OTHER THAN PYTHON IN THE FILE I DONT WANT YOUR ASUPTIONS AND EVERY THING ELSE SHOULD NOT BE PRESENT NO EXTRA TEXT SHOULD BE PRESENT***
+    """,
+    user="""
+    Module: {file_path}
+    ```python
+    {code}
+    ```
+    """,
+    batch="""
+    You are a senior software tester.
+    For each of the following Python modules, generate a complete test case file using a Python testing framework (unittest or pytest).
+    Ensure the tests cover core functionality, error handling, and potential edge cases.
+    - Each test file only tests its own module and imports it by its path in the project.
+    - Use clear and concise variable and function names.
+    - Each value is only Python code: no pip installs, notes or any other text.
+    """,
+)
+
+REFLECT_ON_ERRORS = PromptTemplate(
+    "reflect_on_errors",
+    system="""
+    You are an AI software engineer. Running a generated file resulted in errors.
+    Please provide the best suggestions to improve the code and resolve these errors.
+    """,
+    user="""
+    File: {file_path}
+    **Error Summary:**
+    {error_summary}
+    """,
+)
@@ -0,0 +1,121 @@
+import os
+import sys
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from checkpoints import thread_id_of
+
+
+# Per-file status the loop scheduler routes on.
+FILE_CLEAN = "clean"        # passed its last check or run
+FILE_FAILING = "failing"    # failed and is still being retried
+FILE_CHANGED = "changed"    # rewritten since it was last checked or run
+FILE_STALLED = "stalled"    # failed again with unchanged code, no more retries
+
+
+def code_hash(folder_path: str, file_paths: Iterable[str]) -> str:
+
+    """Hash of the contents of file_paths together; missing files count as
+    empty."""
+
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        digest.update(file_path.encode("utf-8") + b"\0")
+        try:
+            with open(os.path.join(folder_path, file_path), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def interactive(config=None) -> bool:
+
+    """Whether the workflow may stop for a manual review on stdin. An
+    "interactive" entry in the run's configurable wins over INTERACTIVE
+    (true, false or auto); auto only asks when stdin is a terminal."""
+
+    configured = ((config or {}).get("configurable") or {}).get("interactive")
+    if configured is not None:
+        return bool(configured)
+    setting = os.getenv("INTERACTIVE", "auto").lower()
+    if setting == "auto":
+        return sys.stdin is not None and sys.stdin.isatty()
+    return setting == "true"
+
+
+@dataclass
+class RunBudget:
+
+    """Global limits of one run: LLM tokens and seconds spent in nodes, as
+    recorded by METRICS for its thread. 0 means unlimited."""
+
+    tokens: int = 0
+    seconds: float = 0
+
+    @classmethod
+    def from_env(cls) -> "RunBudget":
+        return cls(tokens=int(os.getenv("RUN_TOKEN_BUDGET", "0")), seconds=float(os.getenv("RUN_TIME_BUDGET", "0")))
+
+    def exhausted(self, thread_id: Optional[str]) -> Optional[str]:
+
+        """Why the run is out of budget, or None while it may go on."""
+
+        if thread_id is None or not (self.tokens or self.seconds):
+            return None
+        from metrics import METRICS
+
+        report = METRICS.run_report(thread_id)
+        used = int(report["llm_totals"].get("prompt_tokens", 0) + report["llm_totals"].get("completion_tokens", 0))
+        if self.tokens and used >= self.tokens:
+            return f"token budget spent ({used} of {self.tokens})"
+        if self.seconds and report["wall_seconds"] >= self.seconds:
+            return f"time budget spent ({report['wall_seconds']:.0f}s of {self.seconds:.0f}s)"
+        return None
+
+
+def count_statuses(file_status: Dict[str, str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for status in file_status.values():
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def route_after_improve(state: dict, config: dict = None) -> str:
+
+    """After a review pass, changed files go back through the static checks
+    and review for up to REVIEW_ROUNDS passes, then on to the tests. During
+    error repair the changed files are run again straight away."""
+
+    if state.get("retry_count"):
+        return "run_code"
+    spent = RunBudget.from_env().exhausted(thread_id_of(config))
+    if spent:
+        print(f"[scheduler] {spent}, skipping further review and tests")
+        return "final_execution"
+    changed = [file_path for file_path, status in (state.get("file_status") or {}).items() if status == FILE_CHANGED]
+    if changed and state.get("improvement_count", 0) < int(os.getenv("REVIEW_ROUNDS", "2")):
+        print(f"[scheduler] reviewing {len(changed)} changed files again")
+        return "static_checks"
+    return "generate_tests"
+
+
+def route_after_run(state: dict, config: dict = None) -> str:
+
+    """Repairs the failing files while MAX_RETRIES and the run budget allow;
+    stalled files are not retried. Otherwise the run finishes."""
+
+    file_status = state.get("file_status") or {}
+    failing = [file_path for file_path in state.get("error_log") or {} if file_status.get(file_path) == FILE_FAILING]
+    if not failing:
+        return "final_execution"
+    if state.get("retry_count", 0) >= int(os.getenv("MAX_RETRIES", "3")):
+        print(f"[scheduler] {len(failing)} files still failing after {state['retry_count']} runs")
+        return "final_execution"
+    spent = RunBudget.from_env().exhausted(thread_id_of(config))
+    if spent:
+        print(f"[scheduler] {spent}, {len(failing)} files left failing")
+        return "final_execution"
+    return "reflect_on_errors"
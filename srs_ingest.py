@@ -0,0 +1,222 @@
+import os
+import re
+import json
+from typing import Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+SPEC_CATEGORIES = ("modules", "endpoints", "entities", "requirements")
+
+# Markdown headings written by /upload/ for Heading styles, or numbered
+# headings such as "3.2.1 User Management" in plain-text specs.
+HEADING_RE = re.compile(r"^(#{1,6}\s+\S.*|\d+(\.\d+)*\.?\s+[A-Z][^.]{0,80})$")
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+
+    """The cl100k_base encoding, or None when tiktoken is missing or cannot
+    load it; on first use tiktoken downloads its BPE file, which fails in
+    offline deployments."""
+
+    global _encoding, _encoding_failed
+    if tiktoken is None or _encoding_failed:
+        return None
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"tiktoken encoding unavailable ({type(e).__name__}), estimating token counts")
+            _encoding_failed = True
+            return None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+
+    """Counts tokens with tiktoken when it is installed and its encoding
+    loads, otherwise estimates about four characters per token."""
+
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def token_budget() -> int:
+    return int(os.getenv("SRS_TOKEN_BUDGET", "6000"))
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+
+    """Splits the SRS into (heading, body) sections. Text before the first
+    heading becomes a section with an empty heading."""
+
+    sections = []
+    heading, body = "", []
+    for line in text.splitlines():
+        if HEADING_RE.match(line.strip()):
+            if heading or any(part.strip() for part in body):
+                sections.append((heading, "\n".join(body).strip()))
+            heading, body = line.strip(), []
+        else:
+            body.append(line)
+    if heading or any(part.strip() for part in body):
+        sections.append((heading, "\n".join(body).strip()))
+    return sections
+
+
+SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+
+
+def _split_tokens(text: str, budget: int) -> List[str]:
+
+    """Cuts text into windows of at most budget tokens, regardless of word
+    boundaries; the windows concatenate back to the text."""
+
+    encoding = _get_encoding()
+    if encoding is None:
+        size = max(1, (budget - 1) * 4)
+        return [text[start:start + size] for start in range(0, len(text), size)]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[start:start + budget]) for start in range(0, len(tokens), budget)]
+
+
+def _units(line: str, budget: int) -> List[Tuple[str, str]]:
+
+    """(separator, text) pieces of one line that each fit the budget: the
+    line itself, else its sentences, else token windows."""
+
+    if count_tokens(line) <= budget:
+        return [("\n", line)]
+    units = []
+    for sentence in filter(None, SENTENCE_RE.split(line)):
+        if count_tokens(sentence) <= budget:
+            units.append((" ", sentence))
+        else:
+            windows = _split_tokens(sentence, budget)
+            units.append((" ", windows[0]))
+            units.extend(("", window) for window in windows[1:])
+    units[0] = ("\n", units[0][1])
+    return units
+
+
+def _split_oversized(heading: str, body: str, budget: int) -> List[str]:
+
+    """Breaks a section larger than the budget on line boundaries, repeating
+    its heading on every piece. A line that alone exceeds the budget, such as
+    a long .docx paragraph, is split on sentences and then on tokens."""
+
+    unit_budget = max(1, budget - count_tokens(heading) - 2) if heading else budget
+    pieces, current = [], heading
+    for line in body.split("\n"):
+        for separator, unit in _units(line, unit_budget):
+            candidate = f"{current}{separator}{unit}" if current else unit
+            if current and current != heading and count_tokens(candidate) > budget:
+                pieces.append(current)
+                current = f"{heading}\n{unit}" if heading else unit
+            else:
+                current = candidate
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def chunk_srs(text: str, budget: int) -> List[str]:
+
+    """Packs consecutive sections into chunks that each stay under budget tokens."""
+
+    chunks, current = [], ""
+    for heading, body in split_sections(text):
+        section = f"{heading}\n{body}".strip()
+        if count_tokens(section) > budget:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_oversized(heading, body, budget))
+            continue
+        candidate = f"{current}\n\n{section}" if current else section
+        if current and count_tokens(candidate) > budget:
+            chunks.append(current)
+            current = section
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def extraction_prompt(chunk: str) -> str:
+    return f"""
+    You are a software architect reading one part of a larger SRS document:
+    {chunk}
+    - Extract only what this part specifies. Do not invent anything.
+    - Return a JSON object with the keys 'modules', 'endpoints', 'entities' and 'requirements'.
+    - Each key holds a list of objects with a 'name' and a 'description'. Endpoints use the method and path as name, e.g. "POST /users".
+    - Ensure the response is in valid JSON format without any additional text.
+    """
+
+
+def parse_json_response(text: str):
+
+    """Parses a JSON answer that may be wrapped in a ```json fence."""
+
+    match = re.search(r"```(?:json)?\s+(.*?)\s+```", text, re.DOTALL)
+    return json.loads(match.group(1) if match else text)
+
+
+def merge_specs(specs: List[dict]) -> Dict[str, List[dict]]:
+
+    """Unions the per-chunk extractions by name, keeping every distinct
+    description an item received across chunks."""
+
+    merged = {category: {} for category in SPEC_CATEGORIES}
+    for spec in specs:
+        for category in SPEC_CATEGORIES:
+            for item in spec.get(category) or []:
+                if not isinstance(item, dict) or not item.get("name"):
+                    continue
+                entry = merged[category].setdefault(str(item["name"]).strip(), [])
+                description = str(item.get("description", "")).strip()
+                if description and description not in entry:
+                    entry.append(description)
+    return {
+        category: [{"name": name, "description": " ".join(descriptions)} for name, descriptions in items.items()]
+        for category, items in merged.items()
+    }
+
+
+def render_spec(spec: Dict[str, List[dict]], budget: int = None) -> str:
+
+    """Renders the merged extraction as the compact text the architect prompt
+    receives in place of the full SRS. Descriptions are shortened evenly when
+    the result would exceed budget tokens."""
+
+    def render(limit=None):
+        lines = []
+        for category in SPEC_CATEGORIES:
+            if not spec.get(category):
+                continue
+            lines.append(f"{category.capitalize()}:")
+            for item in spec[category]:
+                description = item["description"]
+                if limit is not None and len(description) > limit:
+                    description = description[:limit].rstrip() + "..."
+                lines.append(f"- {item['name']}: {description}")
+            lines.append("")
+        return "\n".join(lines).strip()
+
+    text = render()
+    if budget is None or count_tokens(text) <= budget:
+        return text
+    items = sum(len(spec.get(category) or []) for category in SPEC_CATEGORIES) or 1
+    chars_per_token = len(text) / count_tokens(text)
+    skeleton = len(render(0))
+    limit = max(40, int((budget * chars_per_token - skeleton) / items))
+    return render(limit)
@@ -0,0 +1,146 @@
+import os
+import ast
+import sys
+import builtins
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
+
+MODULE_DUNDERS = {"__name__", "__file__", "__doc__", "__spec__", "__package__", "__loader__",
+                  "__path__", "__annotations__", "__builtins__", "__dict__"}
+
+
+@lru_cache(maxsize=None)
+def _installed(module: str) -> bool:
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class ProjectIndex:
+
+    """Module paths of the generated tree, for resolving imports without
+    importing anything. Third-party imports resolve only against modules
+    that are really installed, on the host or in third_party (for example
+    the pooled venvs), never against the project's own requirements.txt,
+    which is derived from those same imports."""
+
+    def __init__(self, folder_path: str, file_structure: List[str], third_party: Iterable[str] = ()):
+        self.folder_path = folder_path
+        self.third_party = set(third_party)
+        self.modules = set()
+        for file_path in file_structure:
+            parts = file_path.replace("\\", "/").split("/")
+            for depth in range(1, len(parts)):
+                self.modules.add(".".join(parts[:depth]))
+            if parts[-1].endswith(".py"):
+                name = parts[-1][:-3]
+                self.modules.add(".".join(parts[:-1] + ([] if name == "__init__" else [name])))
+
+    def resolves(self, module: str, file_path: str) -> bool:
+        top = module.split(".")[0]
+        if top in sys.stdlib_module_names or module in self.modules:
+            return True
+        # Running a module puts its own directory on sys.path as well.
+        package = os.path.dirname(file_path).replace("\\", "/").replace("/", ".")
+        if package and f"{package}.{module}" in self.modules:
+            return True
+        if any(name == top or name.startswith(f"{top}.") for name in self.modules):
+            return False
+        return top in self.third_party or _installed(top)
+
+
+def _relative_module(file_path: str, node: ast.ImportFrom) -> str:
+    package = os.path.dirname(file_path).replace("\\", "/").split("/")
+    package = [part for part in package if part]
+    if node.level > 1:
+        package = package[:len(package) - (node.level - 1)]
+    return ".".join(package + ([node.module] if node.module else []))
+
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+
+    """Every name the module binds anywhere. Scopes are not told apart, so
+    only names that are never bound at all are reported as undefined."""
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+        elif type(node).__name__ in ("TypeVar", "ParamSpec", "TypeVarTuple"):
+            names.add(node.name)
+    return names
+
+
+def check_source(file_path: str, source: str, index: ProjectIndex) -> List[str]:
+
+    """Syntax, import and undefined-name diagnostics for one Python file,
+    each as "line N: message"."""
+
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except SyntaxError as error:
+        return [f"line {error.lineno}: SyntaxError: {error.msg}"]
+
+    diagnostics = []
+    star_import = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if not index.resolves(alias.name, file_path):
+                    diagnostics.append(f"line {node.lineno}: cannot resolve import '{alias.name}'")
+        elif isinstance(node, ast.ImportFrom):
+            star_import = star_import or any(alias.name == "*" for alias in node.names)
+            module = _relative_module(file_path, node) if node.level else node.module
+            if module and not index.resolves(module, file_path):
+                shown = "." * node.level + (node.module or "")
+                diagnostics.append(f"line {node.lineno}: cannot resolve import '{shown}'")
+
+    if not star_import:
+        known = _bound_names(tree) | set(dir(builtins)) | MODULE_DUNDERS
+        reported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in known:
+                if node.id not in reported:
+                    reported.add(node.id)
+                    diagnostics.append(f"line {node.lineno}: undefined name '{node.id}'")
+    return sorted(diagnostics, key=lambda message: int(message.split(":")[0][5:]))
+
+
+def check_project(folder_path: str, file_structure: List[str], file_paths: List[str],
+                  max_workers: int = None, third_party: Iterable[str] = ()) -> Dict[str, List[str]]:
+
+    """Checks the Python files among file_paths in a thread pool and returns
+    their diagnostics; a file without findings maps to an empty list."""
+
+    index = ProjectIndex(folder_path, file_structure, third_party)
+    python_files = [file_path for file_path in file_paths if file_path.endswith(".py")]
+    max_workers = max_workers or int(os.getenv("STATIC_CHECK_WORKERS", "4"))
+
+    def check(file_path):
+        with open(os.path.join(folder_path, file_path), "r", encoding="utf-8", errors="replace") as f:
+            return check_source(file_path, f.read(), index)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        return dict(zip(python_files, pool.map(check, python_files)))
+
+
+def format_diagnostics(diagnostics: List[str]) -> str:
+    return "Static checks found these problems; fix each of them:\n" + "\n".join(f"- {item}" for item in diagnostics)
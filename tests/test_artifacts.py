@@ -0,0 +1,78 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from artifacts import RangeNotSatisfiable, collect_files, iter_zip, parse_byte_range
+
+TREE = {
+    "app/__init__.py": b"",
+    "app/main.py": b"from fastapi import FastAPI\n\napp = FastAPI()\n" * 50,
+    "README.md": "# Projekt übersicht\n".encode("utf-8"),
+    "data.bin": os.urandom(4096),
+    ".env": b"SECRET=1\n",
+    "app/__pycache__/main.cpython-311.pyc": b"\0",
+}
+
+
+def build_tree(folder):
+    for relative_path, data in TREE.items():
+        path = folder / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return collect_files(str(folder), include=["*"])
+
+
+def archive(folder, files, **kwargs):
+    return b"".join(iter_zip(str(folder), files, **kwargs))
+
+
+def test_zip_round_trips(tmp_path):
+    files = build_tree(tmp_path)
+    assert files == ["README.md", "app/__init__.py", "app/main.py", "data.bin"]
+    with zipfile.ZipFile(io.BytesIO(archive(tmp_path, files, workers=2))) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == files
+        for name in files:
+            assert zf.read(name) == TREE[name]
+        assert zf.getinfo("app/main.py").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("data.bin").compress_type == zipfile.ZIP_STORED
+
+
+def test_identical_trees_give_identical_bytes(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    files = build_tree(first)
+    build_tree(second)
+    (second / "data.bin").write_bytes(TREE["data.bin"])
+    os.utime(second / "app" / "main.py", (0, 0))
+    assert archive(first, files, workers=1) == archive(second, files, workers=4)
+
+
+def test_empty_archive_is_valid(tmp_path):
+    with zipfile.ZipFile(io.BytesIO(archive(tmp_path, []))) as zf:
+        assert zf.namelist() == []
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=0-0", (0, 0)),
+    ("bytes=0-9,20-29", None),
+    ("bytes=-", None),
+    ("bytes=5-2", None),
+    ("bytes=--5", None),
+    ("bytes=a-b", None),
+    ("items=0-9", None),
+])
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [("bytes=-0", 1000), ("bytes=1000-", 1000), ("bytes=0-", 0)])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_byte_range(header, size)
@@ -0,0 +1,70 @@
+import pytest
+
+from code_patches import PatchError, apply_patch, needs_changes, parse_patch
+
+SOURCE = "def add(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n"
+
+
+@pytest.mark.parametrize("feedback", [None, "", "   ", "No changes needed.", "NO_CHANGES", "Looks good!",
+                                      "no issues found", "  No further improvements are required.\n"])
+def test_bare_verdicts_need_no_changes(feedback):
+    assert not needs_changes(feedback)
+
+
+@pytest.mark.parametrize("feedback", [
+    "Looks good overall, but add input validation to create_user and hash the password before storing it.",
+    "No issues with imports; however get_user must return 404 when the id is missing.",
+    "NO_CHANGES except for the missing type hints on sub.",
+    "- Add a docstring to add.",
+])
+def test_feedback_with_requests_needs_changes(feedback):
+    assert needs_changes(feedback)
+
+
+def test_parse_patch_reads_search_replace_blocks():
+    answer = (
+        "Here is the fix:\n"
+        "<<<<<<< SEARCH\n    return a + b\n=======\n    return int(a) + int(b)\n>>>>>>> REPLACE\n"
+        "<<<<<<< SEARCH\n    return a - b\n=======\n    return int(a) - int(b)\n>>>>>>> REPLACE\n"
+    )
+    assert parse_patch(answer) == [
+        ("    return a + b\n", "    return int(a) + int(b)\n"),
+        ("    return a - b\n", "    return int(a) - int(b)\n"),
+    ]
+
+
+def test_parse_patch_falls_back_to_unified_diff_hunks():
+    answer = (
+        "--- a/app/math.py\n+++ b/app/math.py\n"
+        "@@ -1,2 +1,2 @@\n def add(a, b):\n-    return a + b\n+    return b + a\n"
+    )
+    assert parse_patch(answer) == [("def add(a, b):\n    return a + b\n", "def add(a, b):\n    return b + a\n")]
+
+
+def test_parse_patch_without_blocks_is_empty():
+    assert parse_patch("NO_CHANGES") == []
+
+
+def test_apply_patch_replaces_each_block():
+    blocks = [("    return a + b\n", "    return b + a\n"), ("    return a - b\n", "    return -(b - a)\n")]
+    assert apply_patch(SOURCE, blocks) == SOURCE.replace("a + b", "b + a").replace("a - b", "-(b - a)")
+
+
+def test_apply_patch_ignores_trailing_whitespace():
+    patched = apply_patch(SOURCE, [("def add(a, b):   \n    return a + b\n", "def add(a, b):\n    return 0\n")])
+    assert patched.startswith("def add(a, b):\n    return 0\n\n")
+
+
+@pytest.mark.parametrize("blocks, message", [
+    ([("    return a * b\n", "")], "not found"),
+    ([("(a, b):\n", "(a):\n")], "occurs 2 times"),
+    ([("   \n", "x\n")], "empty search text"),
+    ([("    return a + b\n", "    return (a +\n")], "SyntaxError"),
+])
+def test_apply_patch_rejects_bad_blocks(blocks, message):
+    with pytest.raises(PatchError, match=message):
+        apply_patch(SOURCE, blocks)
+
+
+def test_apply_patch_skips_parse_check_for_other_files():
+    assert apply_patch("a: (\n", [("a: (\n", "a: [\n")], python=False) == "a: [\n"
@@ -0,0 +1,66 @@
+import json
+import zipfile
+
+from docx_stream import extract_docx, iter_blocks
+
+NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+STYLES = f"""<w:styles {NS}>
+  <w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/></w:style>
+  <w:style w:type="paragraph" w:styleId="Berschrift2"><w:name w:val="Überschrift 2"/>
+    <w:pPr><w:outlineLvl w:val="1"/></w:pPr></w:style>
+  <w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/></w:style>
+</w:styles>"""
+
+
+def paragraph(text, style=None):
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{properties}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def cell(*paragraphs):
+    return "<w:tc>" + "".join(paragraph(text) for text in paragraphs) + "</w:tc>"
+
+
+def write_docx(path, body):
+    document = f"<w:document {NS}><w:body>{body}<w:sectPr/></w:body></w:document>"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", STYLES)
+    return str(path)
+
+
+def test_headings_paragraphs_and_tables_in_document_order(tmp_path):
+    nested = "<w:tbl><w:tr>" + cell("inner") + "</w:tr></w:tbl>"
+    body = (
+        paragraph("User Service", "Title")
+        + paragraph("Users", "Heading1")
+        + paragraph("Users sign up with an email.")
+        + paragraph("Endpoints", "Berschrift2")
+        + "<w:tbl><w:tr>" + cell("Method") + cell("Path") + "</w:tr>"
+        + "<w:tr>" + cell("POST", "create") + "<w:tc>" + paragraph("/users") + nested + "</w:tc></w:tr></w:tbl>"
+        + paragraph("", "Heading1")
+        + '<w:p><w:r><w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t></w:r></w:p>'
+    )
+    blocks = list(iter_blocks(write_docx(tmp_path / "srs.docx", body)))
+    assert blocks == [
+        ("heading", (1, "User Service")),
+        ("heading", (1, "Users")),
+        ("paragraph", "Users sign up with an email."),
+        ("heading", (2, "Endpoints")),
+        ("row", ["Method", "Path"]),
+        ("row", ["POST create", "/users inner"]),
+        ("table_end", None),
+        ("paragraph", ""),
+        ("paragraph", "a\tb\nc"),
+    ]
+
+
+def test_extract_docx_writes_markdown_and_an_outline(tmp_path):
+    body = (paragraph("Users", "Heading1") + paragraph("Sign up.")
+            + "<w:tbl><w:tr>" + cell("a|b") + cell("c") + "</w:tr></w:tbl>")
+    text_path, outline_path = tmp_path / "srs.txt", tmp_path / "outline.json"
+    result = extract_docx(write_docx(tmp_path / "srs.docx", body), str(text_path), str(outline_path))
+    assert text_path.read_text() == "# Users\nSign up.\n\n| a\\|b | c |\n\n"
+    assert result == {"characters": len(text_path.read_text()), "outline": [{"level": 1, "title": "Users", "line": 1}]}
+    assert json.loads(outline_path.read_text()) == result["outline"]
@@ -0,0 +1,31 @@
+import os
+import time
+
+from environments import BASE_REQUIREMENTS, EnvironmentPool, requirements_key
+
+
+def make_ready(pool, requirements, age):
+    key = requirements_key(sorted(set(BASE_REQUIREMENTS) | set(requirements)))
+    marker = os.path.join(pool.root, key, ".ready")
+    os.makedirs(os.path.dirname(marker))
+    open(marker, "w").close()
+    os.utime(marker, (time.time() - age, time.time() - age))
+    return key
+
+
+def test_prune_keeps_leased_venvs(tmp_path):
+    pool = EnvironmentPool(root=str(tmp_path / "venvs"), wheel_dir=str(tmp_path / "wheels"), size=3)
+    leased = make_ready(pool, ["fastapi"], age=300)
+    oldest_free = make_ready(pool, ["flask"], age=200)
+    newer = make_ready(pool, ["django"], age=100)
+    with pool.lease(["fastapi"]) as python:
+        assert python.startswith(os.path.join(pool.root, leased))
+        pool._prune(keep="new")
+    remaining = {name for name in os.listdir(pool.root) if os.path.isdir(os.path.join(pool.root, name))}
+    assert remaining == {leased, newer}
+    assert oldest_free not in remaining
+    # The lease refreshed the leased venv, so it is now the most recently used.
+    pool.size = 2
+    pool._prune(keep="new")
+    assert not os.path.isdir(os.path.join(pool.root, newer))
+    assert os.path.isdir(os.path.join(pool.root, leased))
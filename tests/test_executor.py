@@ -0,0 +1,65 @@
+import sys
+
+import pytest
+
+from executor import run_job, run_tests
+
+
+def write(folder, relative, text):
+    path = folder / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def run(folder, source, **kwargs):
+    write(folder, "app/module.py", source)
+    return run_job([sys.executable, "app/module.py"], str(folder), "app/module.py", **kwargs)
+
+
+def test_a_module_runs_with_its_own_directory_on_sys_path(tmp_path):
+    write(tmp_path, "app/helper.py", "VALUE = 42\n")
+    result = run(tmp_path, "import sys\nfrom helper import VALUE\nprint(VALUE, sys.argv[0])\n")
+    assert result.ok and result.stdout.split() == ["42", "app/module.py"]
+
+
+def test_a_traceback_fails_the_module(tmp_path):
+    result = run(tmp_path, "raise ValueError('broken')\n")
+    assert not result.ok and result.returncode == 1 and "ValueError: broken" in result.stderr
+
+
+def test_an_endless_loop_times_out_and_fails(tmp_path):
+    result = run(tmp_path, "while True:\n    pass\n", timeout=1)
+    assert result.timed_out and not result.serving and not result.ok
+
+
+def test_a_listening_server_may_run_into_the_timeout(tmp_path):
+    source = "import socket, time\nsock = socket.socket()\nsock.bind(('127.0.0.1', 0))\nsock.listen()\ntime.sleep(60)\n"
+    result = run(tmp_path, source, timeout=1)
+    assert result.timed_out and result.serving and result.ok
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="rlimits are POSIX only")
+def test_the_memory_limit_applies_in_the_child(tmp_path):
+    result = run(tmp_path, "data = bytearray(512 * 1024 * 1024)\n", memory_mb=256)
+    assert not result.ok and "MemoryError" in result.stderr
+
+
+def test_run_tests_reports_per_file(tmp_path):
+    write(tmp_path, "tests/test_good.py", "def test_ok():\n    assert True\n")
+    write(tmp_path, "tests/test_bad.py", "def test_fails():\n    assert 1 == 2\n")
+    results = run_tests(str(tmp_path))
+    assert results["tests/test_good.py"].ok
+    assert not results["tests/test_bad.py"].ok and "test_fails" in results["tests/test_bad.py"].stderr
+
+
+def test_the_child_gets_a_minimal_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "secret")
+    monkeypatch.setenv("LANGSMITH_API_KEY", "secret")
+    monkeypatch.setenv("LC_ALL", "C.UTF-8")
+    write(tmp_path, ".env", "# project settings\nDATABASE_URL='sqlite:///app.db'\nexport DEBUG=1\n")
+    source = "import os\nfor name in sorted(os.environ):\n    print(name, os.environ[name])\n"
+    result = run(tmp_path, source)
+    env = dict(line.split(" ", 1) for line in result.stdout.splitlines())
+    assert "GROQ_API_KEY" not in env and "LANGSMITH_API_KEY" not in env
+    assert env["DATABASE_URL"] == "sqlite:///app.db" and env["DEBUG"] == "1" and env["LC_ALL"] == "C.UTF-8"
+    assert env["PYTHONPATH"] == str(tmp_path)
@@ -0,0 +1,29 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from fs_utils import UMASK, atomic_write
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX file modes")
+
+
+def mode_of(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_files_get_the_umask_default(tmp_path):
+    path = tmp_path / "app" / "main.py"
+    atomic_write(str(path), "print('hi')\n")
+    assert path.read_text() == "print('hi')\n"
+    assert mode_of(path) == 0o666 & ~UMASK
+
+
+def test_replaced_files_keep_their_mode(tmp_path):
+    path = tmp_path / "run.sh"
+    path.write_text("old\n")
+    os.chmod(path, 0o755)
+    atomic_write(str(path), "new\n")
+    assert path.read_text() == "new\n" and mode_of(path) == 0o755
+    assert os.listdir(tmp_path) == ["run.sh"]
@@ -0,0 +1,38 @@
+from generation_plan import dependency_graph, topological_waves
+
+
+def test_files_wait_for_their_dependencies():
+    files = ["app/main.py", "app/routes/user.py", "app/models/user.py", "README.md"]
+    graph = {"app/main.py": {"app/routes/user.py"}, "app/routes/user.py": {"app/models/user.py"}}
+    assert topological_waves(files, graph) == [["app/models/user.py", "README.md"], ["app/routes/user.py"],
+                                               ["app/main.py"]]
+
+
+def test_dependencies_outside_the_files_count_as_available():
+    assert topological_waves(["app/a.py"], {"app/a.py": {"app/already_generated.py"}}) == [["app/a.py"]]
+
+
+def test_a_cycle_is_broken_by_generating_one_file_alone():
+    files = ["app/a.py", "app/b.py", "app/c.py", "app/d.py"]
+    graph = {"app/a.py": {"app/b.py"}, "app/b.py": {"app/c.py"}, "app/c.py": {"app/b.py"}, "app/d.py": {"app/a.py"}}
+    waves = topological_waves(files, graph)
+    assert waves == [["app/b.py"], ["app/a.py", "app/c.py"], ["app/d.py"]]
+    assert sorted(path for wave in waves for path in wave) == files
+
+
+def test_a_self_contained_cycle_schedules_every_file_once():
+    files = ["x.py", "y.py"]
+    waves = topological_waves(files, {"x.py": {"y.py"}, "y.py": {"x.py"}})
+    assert len(waves) == 2 and sorted(path for wave in waves for path in wave) == files
+
+
+def test_descriptions_reference_files_by_path_module_or_unique_name():
+    files = ["app/main.py", "app/models/user.py", "app/routes/user.py", "app/db.py"]
+    descriptions = {
+        "app/main.py": "Mounts the router from app.routes.user and opens db.py on startup.",
+        "app/routes/user.py": "Uses models/user.py for validation.",
+    }
+    graph = dependency_graph(files, descriptions)
+    assert graph["app/main.py"] == {"app/routes/user.py", "app/db.py"}
+    assert graph["app/routes/user.py"] == {"app/models/user.py"}
+    assert graph["app/db.py"] == set()
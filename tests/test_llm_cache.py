@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+import llm_cache  # noqa: E402
+from langchain_core.outputs import Generation  # noqa: E402
+from llm_cache import TieredLLMCache  # noqa: E402
+
+
+class Clock:
+    now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return clock
+
+
+def texts(generations):
+    return None if generations is None else [generation.text for generation in generations]
+
+
+def test_hits_come_from_memory_then_disk(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TieredLLMCache(path)
+    cache.update("prompt", "model-a", [Generation(text="answer")])
+    assert texts(cache.lookup("prompt", "model-a")) == ["answer"]
+    assert cache.lookup("prompt", "model-b") is None
+    assert texts(TieredLLMCache(path).lookup("prompt", "model-a")) == ["answer"]
+    assert cache.stats["memory_hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TieredLLMCache(path, ttl=60)
+    cache.update("prompt", "model", [Generation(text="answer")])
+    clock.now += 59
+    assert texts(cache.lookup("prompt", "model")) == ["answer"]
+    clock.now += 2
+    assert cache.lookup("prompt", "model") is None
+    assert TieredLLMCache(path, ttl=60).lookup("prompt", "model") is None
+    assert cache.stats["evictions"] == 1
+
+
+def test_the_disk_tier_drops_least_recently_used_entries(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TieredLLMCache(path, memory_size=0, max_bytes=150)
+    for prompt in ("first", "second"):
+        cache.update(prompt, "model", [Generation(text=prompt * 10)])
+        clock.now += 1
+    assert cache.lookup("first", "model") is not None
+    clock.now += 1
+    cache.update("third", "model", [Generation(text="third" * 10)])
+    fresh = TieredLLMCache(path)
+    assert fresh.lookup("second", "model") is None
+    assert texts(fresh.lookup("first", "model")) == ["first" * 10]
+    assert texts(fresh.lookup("third", "model")) == ["third" * 10]
+    assert cache.stats["evictions"] == 1
+
+
+def test_lookups_are_reported(tmp_path, clock):
+    cache = TieredLLMCache(str(tmp_path / "cache.sqlite"))
+    seen = []
+    cache.on_lookup = seen.append
+    cache.lookup("prompt", "model")
+    cache.update("prompt", "model", [Generation(text="answer")])
+    cache.lookup("prompt", "model")
+    assert seen == [False, True]
@@ -0,0 +1,60 @@
+from manifest import changed_files, prune_removed, save_manifest, source_for_test
+from manifest import test_path_for as path_of_test
+
+DESCRIPTIONS = {"app/users.py": "Users.", "app/orders.py": "Orders."}
+
+
+def write(folder, relative, text):
+    path = folder / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def build(folder):
+    for file_path in DESCRIPTIONS:
+        write(folder, file_path, f"# {file_path}\n")
+        write(folder, path_of_test(file_path), "def test_ok():\n    pass\n")
+    save_manifest(str(folder), list(DESCRIPTIONS), DESCRIPTIONS)
+
+
+def test_unchanged_tree_needs_no_regeneration(tmp_path):
+    build(tmp_path)
+    assert changed_files(str(tmp_path), list(DESCRIPTIONS), DESCRIPTIONS) == []
+
+
+def test_new_described_missing_or_edited_files_are_changed(tmp_path):
+    build(tmp_path)
+    write(tmp_path, "app/users.py", "# edited by hand\n")
+    (tmp_path / "app" / "orders.py").unlink()
+    file_structure = list(DESCRIPTIONS) + ["app/items.py"]
+    assert changed_files(str(tmp_path), file_structure, DESCRIPTIONS) == ["app/users.py", "app/orders.py", "app/items.py"]
+    assert changed_files(str(tmp_path), ["app/users.py"], {"app/users.py": "Other."}) == ["app/users.py"]
+
+
+def test_files_dropped_from_the_structure_are_removed_with_their_tests(tmp_path):
+    build(tmp_path)
+    assert prune_removed(str(tmp_path), ["app/users.py"]) == ["app/orders.py", "tests/test_app_orders.py"]
+    assert not (tmp_path / "app" / "orders.py").exists()
+    assert (tmp_path / "tests" / "test_app_users.py").exists()
+
+
+def test_tests_named_after_the_basename_only_are_removed(tmp_path):
+    build(tmp_path)
+    write(tmp_path, "tests/test_users.py", "")
+    write(tmp_path, "tests/test_orders.py", "")
+    assert prune_removed(str(tmp_path), list(DESCRIPTIONS) + ["orders.py"]) == ["tests/test_users.py"]
+    assert (tmp_path / "tests" / "test_orders.py").exists()
+
+
+def test_an_empty_structure_prunes_nothing(tmp_path):
+    build(tmp_path)
+    assert prune_removed(str(tmp_path), []) == []
+    assert (tmp_path / "app" / "orders.py").exists() and (tmp_path / "tests" / "test_app_orders.py").exists()
+
+
+def test_modules_sharing_a_basename_get_separate_tests():
+    file_structure = ["app/models/user.py", "app/routes/user.py", "main.py"]
+    tests = [path_of_test(file_path) for file_path in file_structure]
+    assert tests == ["tests/test_app_models_user.py", "tests/test_app_routes_user.py", "tests/test_main.py"]
+    assert [source_for_test(test, file_structure) for test in tests] == file_structure
+    assert source_for_test("tests/test_other.py", file_structure) == "tests/test_other.py"
@@ -0,0 +1,44 @@
+import json
+
+from prompt_batching import pack_files, parse_batch_response
+
+
+def small(index):
+    return (f"app/m{index}.py", "x = 1\n" * 10)
+
+
+def test_small_files_share_batches_within_the_limits():
+    files = [small(index) for index in range(5)]
+    assert pack_files(files, budget=2000, max_files=2) == ([[0, 1], [2, 3]], [4])
+
+
+def test_large_files_keep_their_own_prompt():
+    files = [small(0), ("app/big.py", "y = 2\n" * 2000), small(1)]
+    assert pack_files(files, budget=2000) == ([[0, 2]], [1])
+
+
+def test_a_zero_budget_turns_batching_off():
+    assert pack_files([small(0), small(1)], budget=0) == ([], [0, 1])
+
+
+def test_the_overhead_counts_against_the_budget():
+    files = [small(index) for index in range(3)]
+    batches, singles = pack_files(files, budget=400, overhead=380)
+    assert batches == [] and singles == [0, 1, 2]
+
+
+def test_batched_answers_are_split_per_path():
+    answer = "```json\n" + json.dumps({"a.py": "```python\nx = 1\n```", "b.py": "Looks fine."}) + "\n```"
+    assert parse_batch_response(answer, ["a.py", "b.py"]) == {"a.py": "```python\nx = 1\n```", "b.py": "Looks fine."}
+
+
+def test_answers_wrapped_in_prose_fall_back_to_the_json_fence():
+    answer = "Here you go:\n```json\n" + json.dumps({"a.py": "ok"}) + "\n```\nThanks."
+    assert parse_batch_response(answer, ["a.py"]) == {"a.py": "ok"}
+
+
+def test_invalid_or_incomplete_answers_fall_back_to_single_prompts():
+    assert parse_batch_response("not json", ["a.py"]) is None
+    assert parse_batch_response(json.dumps(["a.py"]), ["a.py"]) is None
+    assert parse_batch_response(json.dumps({"a.py": "ok"}), ["a.py", "b.py"]) is None
+    assert parse_batch_response(json.dumps({"a.py": "ok", "b.py": "  "}), ["a.py", "b.py"]) is None
@@ -0,0 +1,64 @@
+import pytest
+
+import scheduler
+from scheduler import FILE_CHANGED, FILE_CLEAN, FILE_FAILING, FILE_STALLED, route_after_improve, route_after_run
+
+CONFIG = {"configurable": {"thread_id": "run-1"}}
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setenv("REVIEW_ROUNDS", "2")
+    monkeypatch.setenv("MAX_RETRIES", "3")
+    monkeypatch.delenv("RUN_TOKEN_BUDGET", raising=False)
+    monkeypatch.delenv("RUN_TIME_BUDGET", raising=False)
+
+
+@pytest.fixture
+def spent_budget(monkeypatch):
+    monkeypatch.setenv("RUN_TOKEN_BUDGET", "100")
+    monkeypatch.setattr(scheduler.RunBudget, "exhausted", lambda self, thread_id: "token budget spent (120 of 100)")
+
+
+def test_changed_files_are_reviewed_again_until_the_round_limit():
+    state = {"file_status": {"app/a.py": FILE_CHANGED, "app/b.py": FILE_CLEAN}, "improvement_count": 1}
+    assert route_after_improve(state, CONFIG) == "static_checks"
+    assert route_after_improve({**state, "improvement_count": 2}, CONFIG) == "generate_tests"
+
+
+def test_review_without_changes_goes_on_to_the_tests():
+    assert route_after_improve({"file_status": {"app/a.py": FILE_CLEAN}, "improvement_count": 1}) == "generate_tests"
+
+
+def test_repairs_are_run_again_straight_away():
+    assert route_after_improve({"retry_count": 1, "file_status": {"app/a.py": FILE_CHANGED}}) == "run_code"
+
+
+def test_a_spent_budget_skips_review_and_tests(spent_budget):
+    state = {"file_status": {"app/a.py": FILE_CHANGED}, "improvement_count": 0}
+    assert route_after_improve(state, CONFIG) == "final_execution"
+
+
+def test_failing_files_are_repaired_while_retries_remain():
+    state = {"error_log": {"app/a.py": "ref"}, "file_status": {"app/a.py": FILE_FAILING}, "retry_count": 1}
+    assert route_after_run(state, CONFIG) == "reflect_on_errors"
+    assert route_after_run({**state, "retry_count": 3}, CONFIG) == "final_execution"
+
+
+def test_stalled_files_are_not_retried():
+    state = {"error_log": {"app/a.py": "ref"}, "file_status": {"app/a.py": FILE_STALLED}, "retry_count": 1}
+    assert route_after_run(state, CONFIG) == "final_execution"
+
+
+def test_a_clean_run_finishes():
+    assert route_after_run({"error_log": None, "file_status": {"app/a.py": FILE_CLEAN}, "retry_count": 1}) == "final_execution"
+
+
+def test_a_spent_budget_stops_repairs(spent_budget):
+    state = {"error_log": {"app/a.py": "ref"}, "file_status": {"app/a.py": FILE_FAILING}, "retry_count": 1}
+    assert route_after_run(state, CONFIG) == "final_execution"
+
+
+def test_the_budget_is_unlimited_without_a_thread_or_limits(monkeypatch):
+    assert scheduler.RunBudget(tokens=100).exhausted(None) is None
+    assert scheduler.RunBudget().exhausted("run-1") is None
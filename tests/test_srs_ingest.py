@@ -0,0 +1,41 @@
+import pytest
+
+from srs_ingest import chunk_srs, count_tokens
+
+
+def test_small_sections_share_a_chunk():
+    text = "# Users\nCreate and list users.\n# Orders\nPlace orders."
+    assert chunk_srs(text, 1000) == ["# Users\nCreate and list users.\n\n# Orders\nPlace orders."]
+
+
+@pytest.mark.parametrize("line", ["word " * 8000, "Users can sign up with an email address. " * 800],
+                         ids=["words", "sentences"])
+def test_a_single_long_line_is_split_under_the_budget(line):
+    chunks = chunk_srs("# Big\n" + line, 1000)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 1000 for chunk in chunks)
+    assert all(chunk.startswith("# Big\n") for chunk in chunks)
+    assert "".join("".join(chunk[len("# Big\n"):].split()) for chunk in chunks) == "".join(line.split())
+
+
+def test_sentences_are_kept_whole_when_they_fit():
+    sentence = "Admins can deactivate a user account at any time."
+    chunks = chunk_srs("# Admin\n" + " ".join([sentence] * 400), 300)
+    for chunk in chunks:
+        assert chunk.split("\n", 1)[1].strip().endswith(".")
+
+
+def test_token_counts_fall_back_when_the_encoding_cannot_load(monkeypatch):
+    import srs_ingest
+
+    class OfflineTiktoken:
+        @staticmethod
+        def get_encoding(name):
+            raise ConnectionError("openaipublic.blob.core.windows.net")
+
+    monkeypatch.setattr(srs_ingest, "tiktoken", OfflineTiktoken)
+    monkeypatch.setattr(srs_ingest, "_encoding", None)
+    monkeypatch.setattr(srs_ingest, "_encoding_failed", False)
+    assert count_tokens("x" * 400) == 101
+    chunks = chunk_srs("# Big\n" + "word " * 2000, 500)
+    assert len(chunks) > 1 and all(count_tokens(chunk) <= 500 for chunk in chunks)
@@ -0,0 +1,37 @@
+from environments import EnvironmentPool
+from static_checks import check_project
+
+FILES = ["app/__init__.py", "app/main.py"]
+
+
+def write_project(tmp_path, source):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "__init__.py").write_text("")
+    (tmp_path / "app" / "main.py").write_text(source)
+
+
+def test_requirements_txt_does_not_resolve_imports(tmp_path):
+    write_project(tmp_path, "import fastapii\nfrom pydantick import BaseModel\nimport os\nfrom app import main\n")
+    (tmp_path / "requirements.txt").write_text("fastapii\npydantick\n")
+    assert check_project(str(tmp_path), FILES, ["app/main.py"]) == {"app/main.py": [
+        "line 1: cannot resolve import 'fastapii'",
+        "line 2: cannot resolve import 'pydantick'",
+    ]}
+
+
+def test_third_party_modules_of_the_pool_resolve(tmp_path):
+    root = tmp_path / "venvs"
+    site_packages = root / "abc" / "lib" / "python3.11" / "site-packages"
+    (site_packages / "fastapii").mkdir(parents=True)
+    (site_packages / "fastapii-1.0.dist-info").mkdir()
+    (site_packages / "pydantick.py").write_text("")
+    (root / "abc" / ".ready").write_text("fastapii\n")
+    pool = EnvironmentPool(root=str(root), wheel_dir=str(tmp_path / "wheels"))
+    assert pool.installed_modules() == {"fastapii", "pydantick"}
+
+    project = tmp_path / "project"
+    project.mkdir()
+    write_project(project, "import fastapii\nfrom pydantick import BaseModel\nundefined_name\n")
+    assert check_project(str(project), FILES, ["app/main.py"], third_party=pool.installed_modules()) == {
+        "app/main.py": ["line 3: undefined name 'undefined_name'"],
+    }